@@ -0,0 +1,33 @@
+"""drop single-column indexes on stock_prices covered by the primary key
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-15 10:00:00.000000
+
+Every price query filters on ``symbol`` (equality or ``IN``) plus a ``date``
+range and orders by ``date``. The composite primary key ``(symbol, date)``
+already answers all of them with a single index range scan, read backwards
+for ``ORDER BY date DESC``. The separate ``ix_stock_prices_symbol`` and
+``ix_stock_prices_date`` indexes only invite bitmap-AND plans and make every
+upsert maintain two extra btrees.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "c5d6e7f8a9b0"
+down_revision: Union[str, Sequence[str], None] = "b4c5d6e7f8a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_stock_prices_date", table_name="stock_prices")
+    op.drop_index("ix_stock_prices_symbol", table_name="stock_prices")
+
+
+def downgrade() -> None:
+    op.create_index("ix_stock_prices_symbol", "stock_prices", ["symbol"])
+    op.create_index("ix_stock_prices_date", "stock_prices", ["date"])
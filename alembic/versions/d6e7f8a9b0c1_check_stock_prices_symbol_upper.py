@@ -0,0 +1,31 @@
+"""require uppercase symbols in stock_prices
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-15 12:00:00.000000
+
+Every writer already uppercases the symbol (stock tickers in
+``save_stock_prices``, ``StockIndex`` values for index rows), and every reader
+compares against the uppercased key. The CHECK makes the database guarantee
+it, so lookups can use the raw primary key without any case folding.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "d6e7f8a9b0c1"
+down_revision: Union[str, Sequence[str], None] = "c5d6e7f8a9b0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_check_constraint(
+        "ck_stock_prices_symbol_upper", "stock_prices", "symbol = upper(symbol)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_stock_prices_symbol_upper", "stock_prices", type_="check")
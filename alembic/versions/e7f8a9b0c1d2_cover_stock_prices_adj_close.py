@@ -0,0 +1,44 @@
+"""covering index for close-series reads; drop stock_sma single-column indexes
+
+Revision ID: e7f8a9b0c1d2
+Revises: d6e7f8a9b0c1
+Create Date: 2026-10-15 14:00:00.000000
+
+The indicator and backtest range reads select only ``adj_close`` for a
+``(symbol, date)`` range. ``ix_stock_prices_symbol_date_adj`` carries
+``adj_close`` in its leaf pages so those reads become index-only scans instead
+of one heap fetch per row.
+
+On ``stock_sma`` every query filters ``symbol`` and ``period_length`` before
+the ``date`` range, which the ``(symbol, period_length, date)`` primary key
+already answers; the three single-column indexes only slow down upserts.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "e7f8a9b0c1d2"
+down_revision: Union[str, Sequence[str], None] = "d6e7f8a9b0c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_stock_prices_symbol_date_adj",
+        "stock_prices",
+        ["symbol", "date"],
+        postgresql_include=["adj_close"],
+    )
+    op.drop_index("ix_stock_sma_date", table_name="stock_sma")
+    op.drop_index("ix_stock_sma_period_length", table_name="stock_sma")
+    op.drop_index("ix_stock_sma_symbol", table_name="stock_sma")
+
+
+def downgrade() -> None:
+    op.create_index("ix_stock_sma_symbol", "stock_sma", ["symbol"])
+    op.create_index("ix_stock_sma_period_length", "stock_sma", ["period_length"])
+    op.create_index("ix_stock_sma_date", "stock_sma", ["date"])
+    op.drop_index("ix_stock_prices_symbol_date_adj", table_name="stock_prices")
@@ -8,7 +8,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-from stockidea.datasource import service as datasource_service
+from stockidea.datasource import fmp, service as datasource_service
+from stockidea.indicators import service as indicators_service
 from stockidea.datasource.router import router as datasource_router
 from stockidea.indicators.router import router as indicators_router
 from stockidea.backtest.router import router as backtest_router
@@ -31,6 +32,8 @@ async def lifespan(app: FastAPI):
 
     yield
     refresh_task.cancel()
+    await fmp.close_client()
+    indicators_service.shutdown_pool()
 
 
 app = FastAPI(title="StockPick API", version="0.1.0", lifespan=lifespan)
@@ -1,12 +1,16 @@
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
 import logging
+import time
 from typing import Callable
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from stockidea.datasource import service as datasource_service
 from stockidea.helper import next_monday, previous_friday
-from stockidea.rule_engine import extract_involved_keys
+from stockidea.rule_engine import extract_involved_keys, normalize_rule, normalize_sort
 from stockidea.backtest.scoring import compute_scores
 from stockidea.screener import service as screener_service
 from stockidea.screener.types import Pick, Portfolio
@@ -18,11 +22,50 @@ from stockidea.types import (
     SellTiming,
     StockIndex,
     StockIndicators,
+    StockPrice,
     StopLossConfig,
 )
 
 logger = logging.getLogger(__name__)
 
+# Finished results by run parameters. Agent sweeps and notebooks re-run the same
+# config repeatedly. Each entry remembers the data refresh it was computed after
+# and is dropped once prices, SMAs or constituents are fetched again (by any process,
+# e.g. `fetch-data`); the TTL only bounds how long results stay in memory.
+_RESULT_CACHE_TTL_SECONDS = 3600
+_RESULT_CACHE_MAX_ENTRIES = 32
+# key -> (cached at, data refreshed at, result)
+_result_cache: dict[tuple, tuple[float, datetime | None, BacktestResult]] = {}
+
+
+@dataclass(slots=True)
+class _PriceHistory:
+    """A symbol's daily prices over the backtest window, in ascending date order."""
+
+    prices: list[StockPrice]
+    # Rebalance and sell dates mostly land on trading days: one dict hit
+    by_date: dict[date, StockPrice] = field(init=False)
+    # Holidays and stop-loss ranges bisect these instead
+    _date_ordinals: list[int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.by_date = {price.date: price for price in self.prices}
+        self._date_ordinals = [price.date.toordinal() for price in self.prices]
+
+    def on_or_before(self, target_date: date) -> StockPrice | None:
+        """Price on `target_date`, else the closest trading day before it."""
+        hit = self.by_date.get(target_date)
+        if hit is not None:
+            return hit
+        i = bisect_right(self._date_ordinals, target_date.toordinal())
+        return self.prices[i - 1] if i else None
+
+    def between(self, after: date, through: date) -> list[StockPrice]:
+        """Prices dated strictly after `after` up to and including `through`."""
+        start = bisect_right(self._date_ordinals, after.toordinal())
+        stop = bisect_right(self._date_ordinals, through.toordinal())
+        return self.prices[start:stop]
+
 
 class Backtester:
     db_session: AsyncSession
@@ -38,6 +81,13 @@ class Backtester:
     stop_loss: StopLossConfig | None
     sell_timing: SellTiming
     slippage_pct: float
+    # Price multipliers for a buy / sell fill, fixed for the whole run
+    _buy_fill: float
+    _sell_fill: float
+    # Loaded on a symbol's first pick
+    _price_history: dict[str, _PriceHistory]
+    # Baseline index bars across the backtest window, loaded on first use
+    _index_history: _PriceHistory | None
 
     def __init__(
         self,
@@ -71,6 +121,64 @@ class Backtester:
         self.stop_loss = stop_loss
         self.sell_timing = sell_timing
         self.slippage_pct = slippage_pct
+        self._buy_fill = 1 + slippage_pct / 100
+        self._sell_fill = 1 - slippage_pct / 100
+        self._price_history = {}
+        self._index_history = None
+
+    async def _load_price_histories(self, symbols: list[str]) -> None:
+        """Cache daily prices across the backtest window for `symbols`, ascending.
+
+        Symbols not cached yet are read in one range query; later sell and
+        stop-loss lookups are served from memory instead of querying.
+        """
+        missing = [symbol for symbol in symbols if symbol not in self._price_history]
+        if not missing:
+            return
+        histories = await datasource_service.get_stock_price_histories(
+            self.db_session,
+            missing,
+            from_date=self.date_start.date(),
+            to_date=self.date_end.date(),
+        )
+        for symbol in missing:
+            self._price_history[symbol] = _PriceHistory(histories[symbol.upper()])
+
+    async def _load_price_history(self, symbol: str) -> _PriceHistory:
+        await self._load_price_histories([symbol])
+        return self._price_history[symbol]
+
+    async def _stock_price_near(self, symbol: str, target_date: date) -> StockPrice:
+        """Price on `target_date`, or the closest trading day before it."""
+        history = await self._load_price_history(symbol)
+        price = history.on_or_before(target_date)
+        if price is None:
+            # Nothing cached on/before the target: the nearest bar predates
+            # the window (or doesn't exist), so ask the DB directly.
+            return await datasource_service.get_stock_price_at_date(
+                self.db_session, symbol, target_date, nearest=True
+            )
+        return price
+
+    async def _index_price_near(self, target_date: date) -> StockPrice:
+        """Baseline index price on `target_date`, or the closest day before it."""
+        if self._index_history is None:
+            # Every rebalance reads the baseline twice: one range query up front
+            self._index_history = _PriceHistory(
+                await datasource_service.get_index_price_history(
+                    self.db_session,
+                    self.baseline_index,
+                    from_date=self.date_start.date(),
+                    to_date=self.date_end.date(),
+                )
+            )
+        price = self._index_history.on_or_before(target_date)
+        if price is None:
+            # Nearest bar predates the window (or doesn't exist): ask the DB
+            return await datasource_service.get_index_price_at_date(
+                self.db_session, self.baseline_index, target_date, nearest=True
+            )
+        return price
 
     async def _find_stop_loss_exit(
         self,
@@ -78,26 +186,19 @@ class Backtester:
         buy_date: datetime,
         sell_date: datetime,
         stop_price: float,
-    ) -> tuple[datetime, float] | None:
-        """Scan daily prices between buy and sell. Return (exit_date, exit_price) on
-        the first day whose intra-day low breaches `stop_price`, else None.
-
-        When `low <= stop_price`, the position fills at `stop_price` reduced by
-        `self.slippage_pct` — gap-down opens and queue-jumping at the stop level
-        mean the realistic fill is below the stop trigger.
+    ) -> datetime | None:
+        """Scan daily prices between buy and sell. Return the exit date of the
+        first day whose intra-day low breaches `stop_price`, else None.
+
+        The position exits at `stop_price`; `_execute_picks` then reduces it by
+        `self.slippage_pct` like any other sell — gap-down opens and
+        queue-jumping at the stop level mean the realistic fill is below the
+        stop trigger.
         """
-        prices = await datasource_service.get_stock_price_history(
-            self.db_session,
-            symbol,
-            from_date=(buy_date + timedelta(days=1)).date(),
-            to_date=sell_date.date(),
-        )
-        # get_stock_price_history returns desc-ordered; iterate ascending.
-        for price in sorted(prices, key=lambda p: p.date):
+        history = await self._load_price_history(symbol)
+        for price in history.between(buy_date.date(), sell_date.date()):
             if price.low is not None and price.low <= stop_price:
-                exit_dt = datetime.combine(price.date, buy_date.time())
-                fill_price = stop_price * (1 - self.slippage_pct / 100)
-                return exit_dt, fill_price
+                return datetime.combine(price.date, buy_date.time())
         return None
 
     async def _resolve_stock_sell(
@@ -110,17 +211,11 @@ class Backtester:
         """
         if self.sell_timing == "friday_close":
             target = previous_friday(sell_date)
-            price = (
-                await datasource_service.get_stock_price_at_date(
-                    self.db_session, symbol, target.date(), nearest=True
-                )
-            ).adj_close
+            price = (await self._stock_price_near(symbol, target.date())).adj_close
             return target, price
 
         # monday_open
-        price_data = await datasource_service.get_stock_price_at_date(
-            self.db_session, symbol, sell_date.date(), nearest=True
-        )
+        price_data = await self._stock_price_near(symbol, sell_date.date())
         if price_data.open is None:
             raise ValueError(
                 f"No open price for {symbol} on/near {sell_date.date()} — "
@@ -128,76 +223,99 @@ class Backtester:
             )
         return sell_date, price_data.open
 
-    async def _execute_pick(
+    async def _resolve_pick_exit(
         self, pick: Pick, buy_date: datetime, sell_date: datetime
-    ) -> BacktestInvestment:
-        """Run the holding-period simulation for a sized pick.
+    ) -> tuple[datetime, float]:
+        """Return (exit_date, exit_price) for a pick, before slippage.
 
-        ``pick`` already carries ``buy_price``, ``target_quantity`` and
-        ``stop_loss_price`` — those are computed once by the screener at the
-        rebalance moment. This method handles the sell side: resolve the sell
-        date/price per ``self.sell_timing``, scan for a stop-loss exit, and
-        record the resulting BacktestInvestment.
+        The period-end sell per ``self.sell_timing``, unless the pick's stop
+        loss is breached first, in which case it exits at the stop price.
         """
-        # Apply slippage: pay above the open on buys, receive below the close on
-        # period-end sells. Stop-loss fills already include slippage inside
-        # `_find_stop_loss_exit`.
-        buy_stock_price = pick.buy_price * (1 + self.slippage_pct / 100)
-        position = pick.target_quantity
-        assert position is not None, (
-            "screener.pick must size positions in backtest mode"
+        actual_sell_date, sell_price = await self._resolve_stock_sell(
+            pick.symbol, sell_date
         )
         stop_price = pick.stop_loss_price
+        if stop_price is None:
+            return actual_sell_date, sell_price
 
-        actual_sell_date, raw_sell_price = await self._resolve_stock_sell(
-            pick.symbol, sell_date
+        exit_date = await self._find_stop_loss_exit(
+            pick.symbol, buy_date, actual_sell_date, stop_price
         )
-        sell_stock_price = raw_sell_price * (1 - self.slippage_pct / 100)
-
-        if stop_price is not None:
-            exit_info = await self._find_stop_loss_exit(
-                pick.symbol, buy_date, actual_sell_date, stop_price
-            )
-            if exit_info is not None:
-                actual_sell_date, sell_stock_price = exit_info
-                logger.info(
-                    f"Stop loss hit for {pick.symbol}: exit {actual_sell_date.date()} "
-                    f"@ {sell_stock_price:.2f} (stop={stop_price:.2f}, "
-                    f"buy={buy_stock_price:.2f})"
-                )
+        if exit_date is None:
+            return actual_sell_date, sell_price
+        logger.info(
+            f"Stop loss hit for {pick.symbol}: exit {exit_date.date()} "
+            f"@ {stop_price * self._sell_fill:.2f} "
+            f"(stop={stop_price:.2f}, "
+            f"buy={pick.buy_price * self._buy_fill:.2f})"
+        )
+        return exit_date, stop_price
 
-        profit = (sell_stock_price - buy_stock_price) * position
-        profit_pct = (sell_stock_price - buy_stock_price) / buy_stock_price * 100
+    async def _execute_picks(
+        self, picks: list[Pick], buy_date: datetime, sell_date: datetime
+    ) -> list[BacktestInvestment]:
+        """Run the holding-period simulation for one rebalance's sized picks.
 
-        return BacktestInvestment(
-            symbol=pick.symbol,
-            position=position,
-            buy_price=buy_stock_price,
-            buy_date=buy_date,
-            sell_price=sell_stock_price,
-            sell_date=actual_sell_date,
-            profit_pct=profit_pct,
-            profit=profit,
-            stop_loss_price=stop_price,
+        Each pick already carries ``buy_price``, ``target_quantity`` and
+        ``stop_loss_price`` — those are computed once by the screener at the
+        rebalance moment. This method handles the sell side: resolve every
+        pick's exit, then price the whole rebalance in one array pass and
+        record the resulting BacktestInvestments.
+        """
+        await self._load_price_histories([pick.symbol for pick in picks])
+        exits = [
+            await self._resolve_pick_exit(pick, buy_date, sell_date) for pick in picks
+        ]
+        positions = [pick.target_quantity for pick in picks]
+        assert None not in positions, (
+            "screener.pick must size positions in backtest mode"
         )
 
+        # Apply slippage: pay above the open on buys, receive below the exit
+        # price (period-end close/open or stop level) on sells.
+        buy_prices = np.array([pick.buy_price for pick in picks], dtype=np.float64)
+        buy_prices *= self._buy_fill
+        exit_dates = [exit_date for exit_date, _ in exits]
+        sell_prices = np.array([price for _, price in exits], dtype=np.float64)
+        sell_prices *= self._sell_fill
+        deltas = sell_prices - buy_prices
+        profits = deltas * np.array(positions, dtype=np.float64)
+        profit_pcts = deltas / buy_prices * 100
+
+        return [
+            BacktestInvestment(
+                symbol=pick.symbol,
+                position=position,
+                buy_price=buy_price,
+                buy_date=buy_date,
+                sell_price=sell_price,
+                sell_date=exit_date,
+                profit_pct=profit_pct,
+                profit=profit,
+                stop_loss_price=pick.stop_loss_price,
+            )
+            for pick, position, exit_date, buy_price, sell_price, profit, profit_pct in zip(
+                picks,
+                positions,
+                exit_dates,
+                buy_prices.tolist(),
+                sell_prices.tolist(),
+                profits.tolist(),
+                profit_pcts.tolist(),
+            )
+        ]
+
     async def _resolve_baseline_sell(
         self, sell_date: datetime
     ) -> tuple[datetime, float]:
         """Return (actual_sell_date, sell_price) for the baseline index."""
         if self.sell_timing == "friday_close":
             target = previous_friday(sell_date)
-            price = (
-                await datasource_service.get_index_price_at_date(
-                    self.db_session, self.baseline_index, target.date(), nearest=True
-                )
-            ).adj_close
+            price = (await self._index_price_near(target.date())).adj_close
             return target, price
 
         # monday_open
-        price_data = await datasource_service.get_index_price_at_date(
-            self.db_session, self.baseline_index, sell_date.date(), nearest=True
-        )
+        price_data = await self._index_price_near(sell_date.date())
         if price_data.open is None:
             raise ValueError(
                 f"No open price for {self.baseline_index.value} on/near "
@@ -213,29 +331,24 @@ class Backtester:
         Uses the same buy/sell convention as `invest()` for apples-to-apples
         comparison.
         """
-        buy_price_data = await datasource_service.get_index_price_at_date(
-            self.db_session, self.baseline_index, buy_date.date(), nearest=True
-        )
+        buy_price_data = await self._index_price_near(buy_date.date())
         if buy_price_data.open is None:
             raise ValueError(
                 f"No open price for {self.baseline_index.value} on/near "
                 f"{buy_date.date()} — cannot apply Monday-open buy convention"
             )
         # Apply same slippage friction as stocks for apples-to-apples comparison.
-        baseline_index_price_buy = buy_price_data.open * (1 + self.slippage_pct / 100)
+        baseline_index_price_buy = buy_price_data.open * self._buy_fill
 
         actual_sell_date, raw_baseline_sell = await self._resolve_baseline_sell(
             sell_date
         )
-        baseline_index_price_sell = raw_baseline_sell * (1 - self.slippage_pct / 100)
+        baseline_index_price_sell = raw_baseline_sell * self._sell_fill
         # Use fractional shares for baseline — it's a benchmark, not a real trade
         position = amount / baseline_index_price_buy
-        profit = (baseline_index_price_sell - baseline_index_price_buy) * position
-        profit_pct = (
-            (baseline_index_price_sell - baseline_index_price_buy)
-            / baseline_index_price_buy
-            * 100
-        )
+        delta = baseline_index_price_sell - baseline_index_price_buy
+        profit = delta * position
+        profit_pct = delta / baseline_index_price_buy * 100
 
         investment = BacktestInvestment(
             symbol=self.baseline_index.value,
@@ -249,19 +362,18 @@ class Backtester:
         )
         return investment
 
-    async def backtest(self) -> BacktestResult:
+    def _rebalance_periods(self) -> list[tuple[datetime, datetime]]:
+        """The (buy Monday, hold-until) schedule, built once before the run.
 
-        # Initial Setup
-        balance = self.initial_balance
-        baseline_balance = self.initial_balance
-        backtest_rebalance: list[BacktestRebalance] = []
+        Periods are `rebalance_interval_weeks` long from the Monday after
+        `date_start`, the last one clamped to `date_end`.
+        """
+        periods: list[tuple[datetime, datetime]] = []
         date_iter = next_monday(self.date_start)  # Start from the next Monday
-
+        interval = timedelta(weeks=self.rebalance_interval_weeks)
         while date_iter < self.date_end:
-            end_date = date_iter + timedelta(weeks=self.rebalance_interval_weeks)
             # Allow partial final period — clamp to date_end
-            if end_date > self.date_end:
-                end_date = self.date_end
+            end_date = min(date_iter + interval, self.date_end)
 
             # Skip if the (clamped) period is too short for the holding window.
             # - friday_close: needs a Friday strictly after the buy Monday
@@ -278,6 +390,66 @@ class Backtester:
                 )
                 break
 
+            periods.append((date_iter, end_date))
+            date_iter = end_date
+        return periods
+
+    def _result_cache_key(self) -> tuple:
+        """Every input that shapes the result; callables follow from the expressions."""
+        return (
+            self.initial_balance,
+            self.max_stocks,
+            self.rebalance_interval_weeks,
+            self.date_start,
+            self.date_end,
+            normalize_rule(self.rule_raw),
+            normalize_sort(self.sort_raw),
+            self.from_index,
+            self.baseline_index,
+            self.stop_loss.expression if self.stop_loss is not None else None,
+            self.sell_timing,
+            self.slippage_pct,
+        )
+
+    async def backtest(self) -> BacktestResult:
+        key = self._result_cache_key()
+        refreshed_at = await datasource_service.get_last_refresh_at(self.db_session)
+        cached = _result_cache.pop(key, None)
+        if cached is not None:
+            cached_at, cached_refreshed_at, cached_result = cached
+            if (
+                cached_refreshed_at == refreshed_at
+                and time.monotonic() - cached_at < _RESULT_CACHE_TTL_SECONDS
+            ):
+                _result_cache[key] = cached
+                logger.info("Reusing cached backtest result for identical parameters")
+                # Callers own their result; never hand out the cached instance
+                result = cached_result.model_copy(deep=True)
+                # Echo the expressions as this caller spelled them
+                result.backtest_config.rule = self.rule_raw
+                result.backtest_config.sort_expr = self.sort_raw
+                return result
+
+        result = await self._run_backtest()
+        if len(_result_cache) >= _RESULT_CACHE_MAX_ENTRIES:
+            # Dicts keep insertion order and hits re-insert: drop the least recent
+            del _result_cache[next(iter(_result_cache))]
+        # The run itself may have refreshed stale prices: key on what it saw
+        _result_cache[key] = (
+            time.monotonic(),
+            await datasource_service.get_last_refresh_at(self.db_session),
+            result.model_copy(deep=True),
+        )
+        return result
+
+    async def _run_backtest(self) -> BacktestResult:
+
+        # Initial Setup
+        balance = self.initial_balance
+        baseline_balance = self.initial_balance
+        backtest_rebalance: list[BacktestRebalance] = []
+
+        for date_iter, end_date in self._rebalance_periods():
             logger.info(
                 f"=========== Rebalance on {date_iter.date()} (Balance: {balance}), hold til: {end_date.date()} ==========="
             )
@@ -296,10 +468,9 @@ class Backtester:
                 portfolio=Portfolio(cash=balance, holdings=[]),
             )
 
-            investments: list[BacktestInvestment] = []
-            for pick in screener_result.picks:
-                investment = await self._execute_pick(pick, date_iter, end_date)
-                investments.append(investment)
+            investments = await self._execute_picks(
+                screener_result.picks, date_iter, end_date
+            )
 
             # Calculate the profit of this rebalance
             profit = sum(inv.profit for inv in investments)
@@ -328,9 +499,6 @@ class Backtester:
             # Update the balance
             balance += profit
 
-            # Iterate to the next rebalance date
-            date_iter = end_date
-
         scores = compute_scores(
             backtest_rebalance=backtest_rebalance,
             rebalance_interval_weeks=self.rebalance_interval_weeks,
@@ -3,12 +3,12 @@
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from stockidea.backtest.backtester import Backtester
 from stockidea.datasource.database import conn, queries
 from stockidea.rule_engine import compile_rule, compile_sort, extract_involved_keys
-from stockidea.types import BacktestConfig, StockIndex
+from stockidea.types import BacktestConfig, BacktestResult, StockIndex
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +23,22 @@ async def list_backtests() -> list[dict]:
         return backtests
 
 
-@router.get("/backtests/{backtest_id}")
-async def get_backtest(backtest_id: UUID) -> dict:
-    """Return the full JSON content of a backtest by ID."""
+@router.get("/backtests/{backtest_id}", response_model=BacktestResult)
+async def get_backtest(backtest_id: UUID) -> Response:
+    """Return the full JSON content of a backtest by ID.
+
+    Serialized by pydantic-core straight to bytes; going through model_dump()
+    made FastAPI re-walk every rebalance and investment in jsonable_encoder.
+    """
     async with conn.get_db_session() as db_session:
         backtest_result = await queries.get_backtest_by_id(db_session, backtest_id)
         if backtest_result is None:
             raise HTTPException(
                 status_code=404, detail=f"Backtest not found: {backtest_id}"
             )
-        return backtest_result.model_dump()
+        return Response(
+            content=backtest_result.model_dump_json(), media_type="application/json"
+        )
 
 
 @router.post("/backtest")
@@ -7,6 +7,7 @@ import stockidea.config  # noqa: F401
 
 from stockidea.datasource.cli import datasource_cli
 from stockidea.indicators.cli import indicators_cli
+from stockidea.indicators import service as indicators_service
 from stockidea.backtest.cli import backtest_cli
 from stockidea.agent.cli import agent_cli
 from stockidea.screener.cli import screener_cli
@@ -14,9 +15,11 @@ from stockidea.telegram.cli import telegram_cli
 
 
 @click.group()
-def cli():
+@click.pass_context
+def cli(ctx: click.Context):
     """Stock analysis and backtest tool."""
-    pass
+    # Runs on every exit path, including a command that raised
+    ctx.call_on_close(indicators_service.shutdown_pool)
 
 
 # Register top-level commands from each component's group.
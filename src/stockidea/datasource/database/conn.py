@@ -1,10 +1,16 @@
 from contextlib import asynccontextmanager
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from stockidea.constants import DATABASE_URL
 
 
 _engine = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
 
 
 async def _get_engine() -> AsyncEngine:
@@ -21,9 +27,21 @@ async def _get_engine() -> AsyncEngine:
     return _engine
 
 
+async def _get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Get the session factory, configured once and shared by every caller.
+
+    Each ``get_db_session`` call still gets its own short-lived session, so
+    concurrent tasks never share one and identity maps don't outlive a request.
+    """
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(await _get_engine())
+    return _sessionmaker
+
+
 @asynccontextmanager
 async def get_db_session():
     """Get an async database session context manager."""
-    engine = await _get_engine()
-    async with AsyncSession(bind=engine) as session:
+    session_factory = await _get_sessionmaker()
+    async with session_factory() as session:
         yield session
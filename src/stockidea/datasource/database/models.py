@@ -6,9 +6,11 @@ import uuid
 from sqlalchemy import (
     UUID,
     BigInteger,
+    CheckConstraint,
     Date,
     DateTime,
     Float,
+    Index,
     Integer,
     String,
     ForeignKey,
@@ -23,9 +25,21 @@ class Base(DeclarativeBase):
 
 class DBStockPrice(Base):
     __tablename__ = "stock_prices"
-
-    symbol: Mapped[str] = mapped_column(String, primary_key=True, index=True)
-    date: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    # Symbols are uppercased at ingest, so reads compare the raw key.
+    __table_args__ = (
+        CheckConstraint("symbol = upper(symbol)", name="ck_stock_prices_symbol_upper"),
+        # Close-series reads only touch adj_close: answer them from the index alone
+        Index(
+            "ix_stock_prices_symbol_date_adj",
+            "symbol",
+            "date",
+            postgresql_include=["adj_close"],
+        ),
+    )
+
+    # The (symbol, date) key leads every lookup; no single-column indexes.
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
     open: Mapped[float] = mapped_column(Float, nullable=True)
     high: Mapped[float] = mapped_column(Float, nullable=True)
     low: Mapped[float] = mapped_column(Float, nullable=True)
@@ -57,9 +71,10 @@ class DBStockPriceMetadata(Base):
 class DBStockSma(Base):
     __tablename__ = "stock_sma"
 
-    symbol: Mapped[str] = mapped_column(String, primary_key=True, index=True)
-    period_length: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    date: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    # Every SMA query filters symbol + period_length first; the primary key covers it.
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    period_length: Mapped[int] = mapped_column(Integer, primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
     sma_value: Mapped[float] = mapped_column(Float, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=datetime.now
@@ -1,16 +1,26 @@
 """PostgreSQL database implementation for storing price data using SQLAlchemy."""
 
 from datetime import date, datetime, timedelta
+from itertools import groupby
 import logging
 from typing import cast
-from uuid import UUID
+from uuid import UUID, uuid4
 
+import numpy as np
+from pydantic import TypeAdapter
 from sqlalchemy import (
+    Select,
+    column,
     delete,
+    func,
+    insert,
+    lambda_stmt,
     select,
+    table,
+    text,
     update,
 )
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -53,41 +63,92 @@ from stockidea.types import (
 logger = logging.getLogger(__name__)
 
 
-async def save_index_prices(
-    db_session: AsyncSession, index: StockIndex, prices: list[FMPFullPrice]
-) -> None:
-    now = datetime.now()
-    logger.info(f"Saving {len(prices)} index prices for {index.value}")
+_PRICE_COLUMNS = (
+    "symbol",
+    "date",
+    "open",
+    "high",
+    "low",
+    "close",
+    "adj_close",
+    "volume",
+    "created_at",
+)
 
-    for p in prices:
-        stmt = pg_insert(DBStockPrice).values(
-            symbol=index.value,
-            date=date.fromisoformat(p.date),
-            open=p.open,
-            high=p.high,
-            low=p.low,
-            close=p.close,
-            adj_close=p.close,
-            volume=p.volume,
-            created_at=now,
-        )
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["symbol", "date"],
-            set_={
-                "open": stmt.excluded.open,
-                "high": stmt.excluded.high,
-                "low": stmt.excluded.low,
-                "close": stmt.excluded.close,
-                "adj_close": stmt.excluded.adj_close,
-                "volume": stmt.excluded.volume,
-                "created_at": stmt.excluded.created_at,
-            },
+# Price lists at least this long (full-history backfills) are bulk-loaded with
+# COPY into a staging table; shorter incremental updates use executemany.
+_COPY_MIN_ROWS = 1000
+
+_PRICE_STAGING = table("stock_prices_staging", *(column(c) for c in _PRICE_COLUMNS))
+
+
+def _price_upsert_stmt(source: Select | None = None) -> Insert:
+    """Upsert into stock_prices keyed on (symbol, date).
+
+    Without ``source`` the statement is executemany-able; with it, rows are
+    inserted from that SELECT.
+    """
+    stmt = pg_insert(DBStockPrice)
+    if source is not None:
+        stmt = stmt.from_select(_PRICE_COLUMNS, source)
+    return stmt.on_conflict_do_update(
+        index_elements=["symbol", "date"],
+        set_={
+            "open": stmt.excluded.open,
+            "high": stmt.excluded.high,
+            "low": stmt.excluded.low,
+            "close": stmt.excluded.close,
+            "adj_close": stmt.excluded.adj_close,
+            "volume": stmt.excluded.volume,
+            "created_at": stmt.excluded.created_at,
+        },
+    )
+
+
+async def _copy_price_rows(db_session: AsyncSession, rows: list[dict]) -> None:
+    """COPY rows into a transaction-scoped staging table, then upsert from it.
+
+    COPY can't resolve conflicts itself, so the staging table keeps the
+    re-fetched overlap day upsertable.
+    """
+    # Runs through the session first so the asyncpg transaction is open
+    # before COPY uses the raw connection.
+    await db_session.execute(
+        text(
+            "CREATE TEMP TABLE stock_prices_staging "
+            "(LIKE stock_prices INCLUDING DEFAULTS) ON COMMIT DROP"
         )
-        await db_session.execute(stmt)
+    )
+    conn = await db_session.connection()
+    raw_conn = await conn.get_raw_connection()
+    asyncpg_conn = raw_conn.driver_connection
+    assert asyncpg_conn is not None, "stock_prices COPY requires the asyncpg driver"
+    await asyncpg_conn.copy_records_to_table(
+        "stock_prices_staging",
+        records=[tuple(row[c] for c in _PRICE_COLUMNS) for row in rows],
+        columns=_PRICE_COLUMNS,
+    )
+    await db_session.execute(_price_upsert_stmt(select(_PRICE_STAGING)))
+    # Drop now rather than at commit: a batch may COPY several symbols per commit
+    await db_session.execute(text("DROP TABLE stock_prices_staging"))
+
+
+async def _save_price_rows(
+    db_session: AsyncSession,
+    symbol: str,
+    rows: list[dict],
+    fetched_at: datetime,
+    commit: bool = True,
+) -> None:
+    """Upsert all rows (COPY for backfills, else executemany), bump fetch metadata, and commit."""
+    if len(rows) >= _COPY_MIN_ROWS:
+        await _copy_price_rows(db_session, rows)
+    elif rows:
+        await db_session.execute(_price_upsert_stmt(), rows)
 
     # Upsert metadata
     meta_stmt = pg_insert(DBStockPriceMetadata).values(
-        symbol=index.value, fetched_at=now
+        symbol=symbol, fetched_at=fetched_at
     )
     meta_stmt = meta_stmt.on_conflict_do_update(
         index_elements=["symbol"],
@@ -95,64 +156,102 @@ async def save_index_prices(
     )
     await db_session.execute(meta_stmt)
 
-    await db_session.commit()
+    if commit:
+        await db_session.commit()
 
 
-async def save_stock_prices(
-    db_session: AsyncSession, symbol: str, prices: list[FMPAdjustedStockPrice]
+async def save_index_prices(
+    db_session: AsyncSession, index: StockIndex, prices: list[FMPFullPrice]
 ) -> None:
-    upper_symbol = symbol.upper()
     now = datetime.now()
-    logger.info(f"Saving {len(prices)} prices for {upper_symbol}")
+    logger.info(f"Saving {len(prices)} index prices for {index.value}")
 
-    for p in prices:
-        stmt = pg_insert(DBStockPrice).values(
-            symbol=upper_symbol,
-            date=date.fromisoformat(p.date),
-            open=p.adjOpen,
-            high=p.adjHigh,
-            low=p.adjLow,
-            close=p.adjClose,
-            adj_close=p.adjClose,
-            volume=p.volume,
-            created_at=now,
-        )
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["symbol", "date"],
-            set_={
-                "open": stmt.excluded.open,
-                "high": stmt.excluded.high,
-                "low": stmt.excluded.low,
-                "close": stmt.excluded.close,
-                "adj_close": stmt.excluded.adj_close,
-                "volume": stmt.excluded.volume,
-                "created_at": stmt.excluded.created_at,
-            },
-        )
-        await db_session.execute(stmt)
+    rows = [
+        {
+            "symbol": index.value,
+            "date": date.fromisoformat(p.date),
+            "open": p.open,
+            "high": p.high,
+            "low": p.low,
+            "close": p.close,
+            "adj_close": p.close,
+            "volume": p.volume,
+            "created_at": now,
+        }
+        for p in prices
+    ]
+    await _save_price_rows(db_session, index.value, rows, now)
 
-    # Upsert metadata
-    meta_stmt = pg_insert(DBStockPriceMetadata).values(
-        symbol=upper_symbol, fetched_at=now
-    )
-    meta_stmt = meta_stmt.on_conflict_do_update(
-        index_elements=["symbol"],
-        set_={"fetched_at": meta_stmt.excluded.fetched_at},
-    )
-    await db_session.execute(meta_stmt)
 
-    await db_session.commit()
+async def save_stock_prices(
+    db_session: AsyncSession,
+    symbol: str,
+    prices: list[FMPAdjustedStockPrice],
+    commit: bool = True,
+    fetched_at: datetime | None = None,
+) -> None:
+    """Upsert a symbol's prices. ``commit=False`` leaves the write to the caller's
+    transaction, for batching several symbols into one commit; ``fetched_at``
+    lets the batch stamp every row with one shared timestamp."""
+    upper_symbol = symbol.upper()
+    now = fetched_at or datetime.now()
+    logger.info(f"Saving {len(prices)} prices for {upper_symbol}")
+
+    rows = [
+        {
+            "symbol": upper_symbol,
+            "date": date.fromisoformat(p.date),
+            "open": p.adjOpen,
+            "high": p.adjHigh,
+            "low": p.adjLow,
+            "close": p.adjClose,
+            "adj_close": p.adjClose,
+            "volume": p.volume,
+            "created_at": now,
+        }
+        for p in prices
+    ]
+    await _save_price_rows(db_session, upper_symbol, rows, now, commit=commit)
 
 
 async def get_last_fetched_at(db_session: AsyncSession, symbol: str) -> datetime | None:
     """Get the last fetched_at timestamp for a symbol, or None if never fetched."""
-    stmt = select(DBStockPriceMetadata.fetched_at).where(
-        DBStockPriceMetadata.symbol == symbol.upper()
+    upper_symbol = symbol.upper()
+    stmt = lambda_stmt(
+        lambda: select(DBStockPriceMetadata.fetched_at).where(
+            DBStockPriceMetadata.symbol == upper_symbol
+        )
     )
     result = await db_session.execute(stmt)
     return result.scalar_one_or_none()
 
 
+async def get_last_fetched_at_per_symbol(
+    db_session: AsyncSession, symbols: list[str]
+) -> dict[str, datetime]:
+    """Batch: fetched_at for each symbol. Never-fetched symbols are absent."""
+    if not symbols:
+        return {}
+    upper_symbols = [s.upper() for s in symbols]
+    stmt = select(DBStockPriceMetadata.symbol, DBStockPriceMetadata.fetched_at).where(
+        DBStockPriceMetadata.symbol.in_(upper_symbols)
+    )
+    result = await db_session.execute(stmt)
+    return {row.symbol: row.fetched_at for row in result.all()}
+
+
+async def get_last_data_refresh_at(db_session: AsyncSession) -> datetime | None:
+    """Most recent fetch of any price series, SMA series or constituent list."""
+    stmt = select(
+        select(func.max(DBStockPriceMetadata.fetched_at)).scalar_subquery(),
+        select(func.max(DBStockSmaMetadata.fetched_at)).scalar_subquery(),
+        select(func.max(DBConstituentMetadata.fetched_at)).scalar_subquery(),
+    )
+    result = await db_session.execute(stmt)
+    fetched = [fetched_at for fetched_at in result.one() if fetched_at is not None]
+    return max(fetched) if fetched else None
+
+
 async def is_data_fresh(db_session: AsyncSession, symbol: str) -> bool:
     fetched_at = await get_last_fetched_at(db_session, symbol)
     if fetched_at is None:
@@ -170,21 +269,21 @@ async def save_stock_sma(
     symbol: str,
     period_length: int,
     rows: list[tuple[date, float]],
+    commit: bool = True,
+    fetched_at: datetime | None = None,
 ) -> None:
-    """Upsert daily SMA values for a (symbol, period_length)."""
+    """Upsert daily SMA values for a (symbol, period_length).
+
+    ``commit=False`` leaves the write to the caller's transaction, and
+    ``fetched_at`` overrides the row/metadata timestamp (default: now).
+    """
     upper_symbol = symbol.upper()
-    now = datetime.now()
+    now = fetched_at or datetime.now()
     if rows:
         logger.info(f"Saving {len(rows)} SMA({period_length}) rows for {upper_symbol}")
 
-    for sma_date, sma_value in rows:
-        stmt = pg_insert(DBStockSma).values(
-            symbol=upper_symbol,
-            period_length=period_length,
-            date=sma_date,
-            sma_value=sma_value,
-            created_at=now,
-        )
+    if rows:
+        stmt = pg_insert(DBStockSma)
         stmt = stmt.on_conflict_do_update(
             index_elements=["symbol", "period_length", "date"],
             set_={
@@ -192,7 +291,19 @@ async def save_stock_sma(
                 "created_at": stmt.excluded.created_at,
             },
         )
-        await db_session.execute(stmt)
+        await db_session.execute(
+            stmt,
+            [
+                {
+                    "symbol": upper_symbol,
+                    "period_length": period_length,
+                    "date": sma_date,
+                    "sma_value": sma_value,
+                    "created_at": now,
+                }
+                for sma_date, sma_value in rows
+            ],
+        )
 
     meta_stmt = pg_insert(DBStockSmaMetadata).values(
         symbol=upper_symbol, period_length=period_length, fetched_at=now
@@ -202,20 +313,41 @@ async def save_stock_sma(
         set_={"fetched_at": meta_stmt.excluded.fetched_at},
     )
     await db_session.execute(meta_stmt)
-    await db_session.commit()
+    if commit:
+        await db_session.commit()
 
 
 async def get_sma_fetched_at(
     db_session: AsyncSession, symbol: str, period_length: int
 ) -> datetime | None:
+    upper_symbol = symbol.upper()
     stmt = select(DBStockSmaMetadata.fetched_at).where(
-        DBStockSmaMetadata.symbol == symbol.upper(),
+        DBStockSmaMetadata.symbol == upper_symbol,
         DBStockSmaMetadata.period_length == period_length,
     )
     result = await db_session.execute(stmt)
     return result.scalar_one_or_none()
 
 
+async def get_sma_fetched_at_per_symbol(
+    db_session: AsyncSession, symbols: list[str], period_lengths: list[int]
+) -> dict[tuple[str, int], datetime]:
+    """Batch: fetched_at for each (symbol, period_length). Never-fetched pairs are absent."""
+    if not symbols:
+        return {}
+    upper_symbols = [s.upper() for s in symbols]
+    stmt = select(
+        DBStockSmaMetadata.symbol,
+        DBStockSmaMetadata.period_length,
+        DBStockSmaMetadata.fetched_at,
+    ).where(
+        DBStockSmaMetadata.symbol.in_(upper_symbols),
+        DBStockSmaMetadata.period_length.in_(period_lengths),
+    )
+    result = await db_session.execute(stmt)
+    return {(row.symbol, row.period_length): row.fetched_at for row in result.all()}
+
+
 async def is_sma_fresh(
     db_session: AsyncSession, symbol: str, period_length: int
 ) -> bool:
@@ -233,9 +365,10 @@ async def load_stock_sma(
     to_date: date,
 ) -> list[tuple[date, float]]:
     """Load cached SMA values for a (symbol, period_length) over a date range, ascending."""
+    upper_symbol = symbol.upper()
     stmt = (
         select(DBStockSma.date, DBStockSma.sma_value)
-        .where(DBStockSma.symbol == symbol.upper())
+        .where(DBStockSma.symbol == upper_symbol)
         .where(DBStockSma.period_length == period_length)
         .where(DBStockSma.date >= from_date)
         .where(DBStockSma.date <= to_date)
@@ -252,9 +385,10 @@ async def get_sma_at_or_before(
     target_date: date,
 ) -> float | None:
     """Return the most recent SMA value on/before target_date (or None if missing)."""
+    upper_symbol = symbol.upper()
     stmt = (
         select(DBStockSma.sma_value)
-        .where(DBStockSma.symbol == symbol.upper())
+        .where(DBStockSma.symbol == upper_symbol)
         .where(DBStockSma.period_length == period_length)
         .where(DBStockSma.date <= target_date)
         .order_by(DBStockSma.date.desc())
@@ -287,12 +421,16 @@ async def get_latest_sma_per_symbol(
 
 
 async def get_latest_price_date_per_symbol(
-    db_session: AsyncSession, symbols: list[str], target_date: date
+    db_session: AsyncSession,
+    symbols: list[str],
+    target_date: date,
+    not_before: date | None = None,
 ) -> dict[str, date]:
     """Batch: for each symbol, return the latest price date on/before target_date.
 
-    Symbols with no prices on/before the target date are absent from the dict.
-    Used to detect delisted/stale tickers in the constituent list.
+    Symbols with no prices on/before the target date (or none since
+    ``not_before``, when given) are absent from the dict. Used to detect
+    delisted/stale tickers in the constituent list.
     """
     if not symbols:
         return {}
@@ -304,10 +442,46 @@ async def get_latest_price_date_per_symbol(
         .where(DBStockPrice.date <= target_date)
         .order_by(DBStockPrice.symbol, DBStockPrice.date.desc())
     )
+    if not_before is not None:
+        # DISTINCT ON reads every matching row per symbol; bounding the range
+        # keeps that to a few weeks instead of the whole history.
+        stmt = stmt.where(DBStockPrice.date >= not_before)
     result = await db_session.execute(stmt)
     return {row.symbol: row.date for row in result.all()}
 
 
+async def get_latest_price_per_symbol(
+    db_session: AsyncSession, symbols: list[str], target_date: date
+) -> dict[str, StockPrice]:
+    """Batch: for each symbol, return its price on target_date or the nearest date before.
+
+    Same rows as get_price_by_date(..., nearest=True), in one query. Symbols with
+    no prices on/before the target date are absent from the dict.
+    """
+    if not symbols:
+        return {}
+    upper_symbols = [s.upper() for s in symbols]
+    stmt = (
+        select(
+            DBStockPrice.symbol,
+            DBStockPrice.date,
+            DBStockPrice.adj_close,
+            DBStockPrice.open,
+        )
+        .distinct(DBStockPrice.symbol)
+        .where(DBStockPrice.symbol.in_(upper_symbols))
+        .where(DBStockPrice.date <= target_date)
+        .order_by(DBStockPrice.symbol, DBStockPrice.date.desc())
+    )
+    result = await db_session.execute(stmt)
+    return {
+        row.symbol: StockPrice(
+            symbol=row.symbol, date=row.date, adj_close=row.adj_close, open=row.open
+        )
+        for row in result.all()
+    }
+
+
 # =============================================================================
 # Constituent Change Queries
 # =============================================================================
@@ -326,68 +500,74 @@ async def save_constituent_changes(
     await db_session.execute(
         delete(DBConstituentMetadata).where(DBConstituentMetadata.index == index.value)
     )
-    await db_session.flush()
 
-    # Insert new
-    for change in changes:
-        db_session.add(
-            DBConstituentChange(
-                index=index.value,
-                date=change.date,
-                added_symbol=change.added_symbol,
-                removed_symbol=change.removed_symbol,
-            )
+    # Insert new in one executemany rather than one ORM object per change
+    if changes:
+        await db_session.execute(
+            insert(DBConstituentChange),
+            [
+                {
+                    "index": index.value,
+                    "date": change.date,
+                    "added_symbol": change.added_symbol,
+                    "removed_symbol": change.removed_symbol,
+                }
+                for change in changes
+            ],
         )
 
     db_session.add(DBConstituentMetadata(index=index.value, fetched_at=datetime.now()))
     await db_session.commit()
 
 
+_CONSTITUENT_LIST_ADAPTER = TypeAdapter(list[ConstituentChange])
+
+
 async def load_constituent_changes(
     db_session: AsyncSession,
     index: StockIndex,
 ) -> list[ConstituentChange] | None:
     """Load constituent changes for an index. Returns None if stale or missing."""
     # Check freshness
-    meta_stmt = select(DBConstituentMetadata).where(
+    meta_stmt = select(DBConstituentMetadata.fetched_at).where(
         DBConstituentMetadata.index == index.value
     )
     meta_result = await db_session.execute(meta_stmt)
-    metadata = meta_result.scalar_one_or_none()
-    if metadata is None or metadata.fetched_at < datetime.now() - timedelta(days=1):
+    fetched_at = meta_result.scalar_one_or_none()
+    if fetched_at is None or fetched_at < datetime.now() - timedelta(days=1):
         return None
 
-    # Load changes
+    # Load changes as plain column rows rather than ORM entities
     changes_stmt = (
-        select(DBConstituentChange)
+        select(
+            DBConstituentChange.date,
+            DBConstituentChange.added_symbol,
+            DBConstituentChange.removed_symbol,
+        )
         .where(DBConstituentChange.index == index.value)
         .order_by(DBConstituentChange.date)
     )
     changes_result = await db_session.execute(changes_stmt)
-    rows = changes_result.scalars().all()
-
-    return [
-        ConstituentChange(
-            date=row.date,
-            added_symbol=row.added_symbol,
-            removed_symbol=row.removed_symbol,
-        )
-        for row in rows
-    ]
+    return _CONSTITUENT_LIST_ADAPTER.validate_python(
+        changes_result.all(), from_attributes=True
+    )
 
 
 async def is_constituent_data_fresh(
     db_session: AsyncSession, index: StockIndex
 ) -> bool:
     """Check if constituent data for an index was fetched today."""
-    stmt = select(DBConstituentMetadata).where(
+    stmt = select(DBConstituentMetadata.fetched_at).where(
         DBConstituentMetadata.index == index.value
     )
     result = await db_session.execute(stmt)
-    metadata = result.scalar_one_or_none()
-    if metadata is None:
+    fetched_at = result.scalar_one_or_none()
+    if fetched_at is None:
         return False
-    return metadata.fetched_at > datetime.now() - timedelta(days=1)
+    return fetched_at > datetime.now() - timedelta(days=1)
+
+
+_PRICE_LIST_ADAPTER = TypeAdapter(list[StockPrice])
 
 
 async def get_prices_by_date_range(
@@ -396,6 +576,41 @@ async def get_prices_by_date_range(
     """
     Get the stock prices for a given symbol and date range.
     """
+    upper_symbol = symbol.upper()
+    stmt = lambda_stmt(
+        lambda: (
+            select(
+                DBStockPrice.symbol,
+                DBStockPrice.date,
+                DBStockPrice.adj_close,
+                DBStockPrice.open,
+                DBStockPrice.low,
+                DBStockPrice.volume,
+            )
+            .where(DBStockPrice.symbol == upper_symbol)
+            .where(DBStockPrice.date >= from_date)
+            .where(DBStockPrice.date <= to_date)
+            .order_by(DBStockPrice.date.desc())
+        )
+    )
+    result = await db_session.execute(stmt)
+    # One validator call for the whole range instead of one StockPrice(...) per row
+    return _PRICE_LIST_ADAPTER.validate_python(result.all(), from_attributes=True)
+
+
+async def get_prices_per_symbol(
+    db_session: AsyncSession, symbols: list[str], from_date: date, to_date: date
+) -> dict[str, list[StockPrice]]:
+    """Batch get_prices_by_date_range: one range scan for all symbols.
+
+    Keyed by uppercased symbol, each list in ascending date order (ready to
+    bisect, unlike the newest-first single-symbol query); a symbol with no
+    rows in the range maps to an empty list.
+    """
+    upper_symbols = [s.upper() for s in symbols]
+    prices: dict[str, list[StockPrice]] = {s: [] for s in upper_symbols}
+    if not upper_symbols:
+        return prices
     stmt = (
         select(
             DBStockPrice.symbol,
@@ -405,24 +620,51 @@ async def get_prices_by_date_range(
             DBStockPrice.low,
             DBStockPrice.volume,
         )
-        .where(DBStockPrice.symbol == symbol.upper())
+        .where(DBStockPrice.symbol.in_(upper_symbols))
         .where(DBStockPrice.date >= from_date)
         .where(DBStockPrice.date <= to_date)
-        .order_by(DBStockPrice.date.desc())
+        .order_by(DBStockPrice.symbol, DBStockPrice.date)
     )
     result = await db_session.execute(stmt)
-    prices = result.all()
-    return [
-        StockPrice(
-            symbol=price.symbol,
-            date=price.date,
-            adj_close=price.adj_close,
-            open=price.open,
-            low=price.low,
-            volume=price.volume,
+    rows = _PRICE_LIST_ADAPTER.validate_python(result.all(), from_attributes=True)
+    for symbol, group in groupby(rows, key=lambda price: price.symbol):
+        prices[symbol] = list(group)
+    return prices
+
+
+async def get_close_series_per_symbol(
+    db_session: AsyncSession, symbols: list[str], from_date: date, to_date: date
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Date ordinals and adjusted closes per symbol, in one range scan.
+
+    Column-oriented twin of get_prices_per_symbol for the indicator
+    calculator, which only reads these two columns; no StockPrice per row.
+    Keyed by uppercased symbol, each series newest first; a symbol with no
+    rows in the range maps to empty arrays.
+    """
+    upper_symbols = [s.upper() for s in symbols]
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+    series = {s: empty for s in upper_symbols}
+    if not upper_symbols:
+        return series
+    stmt = (
+        select(DBStockPrice.symbol, DBStockPrice.date, DBStockPrice.adj_close)
+        .where(DBStockPrice.symbol.in_(upper_symbols))
+        .where(DBStockPrice.date >= from_date)
+        .where(DBStockPrice.date <= to_date)
+        .order_by(DBStockPrice.symbol, DBStockPrice.date.desc())
+    )
+    result = await db_session.execute(stmt)
+    for symbol, group in groupby(result.all(), key=lambda row: row.symbol):
+        rows = list(group)
+        ordinals = np.fromiter(
+            (row.date.toordinal() for row in rows), dtype=np.int64, count=len(rows)
         )
-        for price in prices
-    ]
+        closes = np.fromiter(
+            (row.adj_close for row in rows), dtype=float, count=len(rows)
+        )
+        series[symbol] = (ordinals, closes)
+    return series
 
 
 async def get_price_by_date(
@@ -432,17 +674,37 @@ async def get_price_by_date(
     Get the stock price for a given symbol and date.
     If nearest is True, and the price is not found for the given date, return the price for the nearest date before the given date.
     """
-    stmt = (
-        select(
-            DBStockPrice.symbol,
-            DBStockPrice.date,
-            DBStockPrice.adj_close,
-            DBStockPrice.open,
+    upper_symbol = symbol.upper()
+    if nearest:
+        # The exact date or, failing that, the closest one before it: one round-trip
+        stmt = lambda_stmt(
+            lambda: (
+                select(
+                    DBStockPrice.symbol,
+                    DBStockPrice.date,
+                    DBStockPrice.adj_close,
+                    DBStockPrice.open,
+                )
+                .where(DBStockPrice.symbol == upper_symbol)
+                .where(DBStockPrice.date <= target_date)
+                .order_by(DBStockPrice.date.desc())
+                .limit(1)
+            )
+        )
+    else:
+        # (symbol, date) is the primary key, so this matches at most one row
+        stmt = lambda_stmt(
+            lambda: (
+                select(
+                    DBStockPrice.symbol,
+                    DBStockPrice.date,
+                    DBStockPrice.adj_close,
+                    DBStockPrice.open,
+                )
+                .where(DBStockPrice.symbol == upper_symbol)
+                .where(DBStockPrice.date == target_date)
+            )
         )
-        .where(DBStockPrice.symbol == symbol.upper())
-        .where(DBStockPrice.date == target_date)
-        .order_by(DBStockPrice.date.desc())
-    )
     result = await db_session.execute(stmt)
     price = result.first()  # Returns Row object or None when selecting multiple columns
     if price is not None:
@@ -452,31 +714,6 @@ async def get_price_by_date(
             adj_close=price.adj_close,
             open=price.open,
         )
-    if nearest:
-        # Find the price of nearest date we have before the target date
-        stmt = (
-            select(
-                DBStockPrice.symbol,
-                DBStockPrice.date,
-                DBStockPrice.adj_close,
-                DBStockPrice.open,
-            )
-            .where(DBStockPrice.symbol == symbol.upper())
-            .where(DBStockPrice.date < target_date)
-            .order_by(DBStockPrice.date.desc())
-            .limit(1)
-        )
-        result = await db_session.execute(stmt)
-        price = (
-            result.first()
-        )  # Returns Row object or None when selecting multiple columns
-        if price is not None:
-            return StockPrice(
-                symbol=price.symbol,
-                date=price.date,
-                adj_close=price.adj_close,
-                open=price.open,
-            )
 
     raise ValueError(
         f"No price data available for symbol: {symbol} on date: {target_date}"
@@ -494,8 +731,12 @@ async def save_backtest_result(
     """
     logger.info("Saving backtest result to database")
 
-    # Create backtest record
+    # Primary keys are client-side uuid4s, so assign them up front: children can
+    # reference their parents without a flush per rebalance, and the whole
+    # result goes out in batched INSERTs at commit.
+    backtest_id = uuid4()
     backtest = DBBacktest(
+        id=backtest_id,
         strategy_id=strategy_id,
         initial_balance=result.initial_balance,
         final_balance=result.final_balance,
@@ -520,12 +761,12 @@ async def save_backtest_result(
         scores_json=result.scores.model_dump_json() if result.scores else None,
     )
     db_session.add(backtest)
-    await db_session.flush()  # Flush to get the backtest ID
-    backtest_id = backtest.id  # Store ID before commit to avoid greenlet issues
 
     # Create rebalance history records
     for rebalance in result.backtest_rebalance:
+        rebalance_id = uuid4()
         backtest_rebalance = DBBacktestRebalance(
+            id=rebalance_id,
             backtest_id=backtest_id,
             date=rebalance.date,
             balance=rebalance.balance,
@@ -536,12 +777,11 @@ async def save_backtest_result(
             baseline_balance=rebalance.baseline_balance,
         )
         db_session.add(backtest_rebalance)
-        await db_session.flush()  # Flush to get the backtest_rebalance ID
 
         # Create investment records
         for investment in rebalance.investments:
             investment_record = DBBacktestInvestment(
-                backtest_rebalance_id=backtest_rebalance.id,
+                backtest_rebalance_id=rebalance_id,
                 symbol=investment.symbol,
                 position=investment.position,
                 buy_price=investment.buy_price,
@@ -626,24 +866,17 @@ async def list_backtests(
     return summaries
 
 
+_INVESTMENT_LIST_ADAPTER = TypeAdapter(list[BacktestInvestment])
+
+
 def _db_backtest_to_result(db_backtest: DBBacktest) -> BacktestResult:
     """Convert a DBBacktest database object to a BacktestResult Pydantic model."""
     backtest_rebalances = []
     for db_rebalance in db_backtest.backtest_rebalances:
-        investments = [
-            BacktestInvestment(
-                symbol=inv.symbol,
-                position=inv.position,
-                buy_price=inv.buy_price,
-                buy_date=inv.buy_date,
-                sell_price=inv.sell_price,
-                sell_date=inv.sell_date,
-                profit_pct=inv.profit_pct,
-                profit=inv.profit,
-                stop_loss_price=inv.stop_loss_price,
-            )
-            for inv in db_rebalance.backtest_investments
-        ]
+        # Column names match the model fields: one validator call per rebalance
+        investments = _INVESTMENT_LIST_ADAPTER.validate_python(
+            db_rebalance.backtest_investments, from_attributes=True
+        )
         backtest_rebalances.append(
             BacktestRebalance(
                 date=db_rebalance.date,
@@ -701,6 +934,14 @@ def _db_backtest_to_result(db_backtest: DBBacktest) -> BacktestResult:
 # =============================================================================
 
 
+# Plain column rows skip ORM identity-map/instrumentation overhead on the
+# per-symbol indicator cache read.
+_INDICATOR_COLUMNS = [
+    DBStockIndicators.__table__.c[name] for name in StockIndicators.model_fields
+]
+_INDICATORS_LIST_ADAPTER = TypeAdapter(list[StockIndicators])
+
+
 async def save_stock_indicators(
     db_session: AsyncSession,
     stock_indicators: StockIndicators,
@@ -724,64 +965,43 @@ async def load_stock_indicators(
 
     Returns a StockIndicators object, or None if no data found.
     """
+    upper_symbol = symbol.upper()
     stmt = (
-        select(DBStockIndicators)
-        .where(DBStockIndicators.symbol == symbol.upper())
+        select(*_INDICATOR_COLUMNS)
+        .where(DBStockIndicators.symbol == upper_symbol)
         .where(DBStockIndicators.date == indicators_date)
     )
     result = await db_session.execute(stmt)
-    record = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if record is None:
+    if row is None:
         return None
 
-    return StockIndicators(
-        symbol=record.symbol,
-        date=record.date,
-        total_weeks=record.total_weeks,
-        slope_pct_13w=record.slope_pct_13w,
-        slope_pct_26w=record.slope_pct_26w,
-        slope_pct_52w=record.slope_pct_52w,
-        r_squared_4w=record.r_squared_4w,
-        r_squared_13w=record.r_squared_13w,
-        r_squared_26w=record.r_squared_26w,
-        r_squared_52w=record.r_squared_52w,
-        log_slope_13w=record.log_slope_13w,
-        log_r_squared_13w=record.log_r_squared_13w,
-        log_slope_26w=record.log_slope_26w,
-        log_r_squared_26w=record.log_r_squared_26w,
-        log_slope_52w=record.log_slope_52w,
-        log_r_squared_52w=record.log_r_squared_52w,
-        change_pct_1w=record.change_pct_1w,
-        change_pct_2w=record.change_pct_2w,
-        change_pct_4w=record.change_pct_4w,
-        change_pct_13w=record.change_pct_13w,
-        change_pct_26w=record.change_pct_26w,
-        change_pct_52w=record.change_pct_52w,
-        max_jump_pct_1w=record.max_jump_pct_1w,
-        max_drop_pct_1w=record.max_drop_pct_1w,
-        max_jump_pct_2w=record.max_jump_pct_2w,
-        max_drop_pct_2w=record.max_drop_pct_2w,
-        max_jump_pct_4w=record.max_jump_pct_4w,
-        max_drop_pct_4w=record.max_drop_pct_4w,
-        return_std_52w=record.return_std_52w,
-        downside_std_52w=record.downside_std_52w,
-        max_drawdown_pct_4w=record.max_drawdown_pct_4w,
-        max_drawdown_pct_13w=record.max_drawdown_pct_13w,
-        max_drawdown_pct_26w=record.max_drawdown_pct_26w,
-        max_drawdown_pct_52w=record.max_drawdown_pct_52w,
-        pct_weeks_positive_4w=record.pct_weeks_positive_4w,
-        pct_weeks_positive_13w=record.pct_weeks_positive_13w,
-        pct_weeks_positive_26w=record.pct_weeks_positive_26w,
-        pct_weeks_positive_52w=record.pct_weeks_positive_52w,
-        acceleration_pct_13w=record.acceleration_pct_13w,
-        from_high_pct_4w=record.from_high_pct_4w,
-        price_vs_ma20_pct=record.price_vs_ma20_pct,
-        price_vs_ma50_pct=record.price_vs_ma50_pct,
-        price_vs_ma100_pct=record.price_vs_ma100_pct,
-        price_vs_ma200_pct=record.price_vs_ma200_pct,
-        ma50_vs_ma200_pct=record.ma50_vs_ma200_pct,
+    return StockIndicators.model_validate(dict(row._mapping))
+
+
+async def load_stock_indicators_batch(
+    db_session: AsyncSession,
+    symbols: list[str],
+    indicators_date: date,
+) -> dict[str, StockIndicators]:
+    """Batch ``load_stock_indicators`` for one date with a single query.
+
+    Keyed by uppercased symbol; symbols with no stored indicators are absent.
+    """
+    if not symbols:
+        return {}
+    upper_symbols = [s.upper() for s in symbols]
+    stmt = (
+        select(*_INDICATOR_COLUMNS)
+        .where(DBStockIndicators.symbol.in_(upper_symbols))
+        .where(DBStockIndicators.date == indicators_date)
+    )
+    result = await db_session.execute(stmt)
+    indicators = _INDICATORS_LIST_ADAPTER.validate_python(
+        result.all(), from_attributes=True
     )
+    return {item.symbol: item for item in indicators}
 
 
 async def list_indicator_dates(db_session: AsyncSession) -> list[datetime]:
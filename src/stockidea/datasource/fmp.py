@@ -1,6 +1,8 @@
+import asyncio
 from datetime import date
 import logging
 import httpx
+from pydantic import TypeAdapter
 
 from stockidea.constants import FMP_API_KEY, FMP_BASE_URL
 from stockidea.types import (
@@ -12,6 +14,61 @@ from stockidea.types import (
 
 logger = logging.getLogger(__name__)
 
+# Validate whole FMP price responses in one pydantic-core call, straight from the
+# response bytes, rather than json.loads then one model_validate per row.
+_ADJUSTED_PRICES_ADAPTER = TypeAdapter(list[FMPAdjustedStockPrice])
+_FULL_PRICES_ADAPTER = TypeAdapter(list[FMPFullPrice])
+
+# One pooled client per event loop so repeated calls (hundreds of symbols per
+# refresh) reuse keep-alive connections instead of a new TCP+TLS handshake each.
+# A refresh batch fans out to more requests (prices + SMA windows per symbol)
+# than there are connections; those queue for a warm connection with no pool
+# timeout instead of failing after 30s in the queue.
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Get the shared FMP HTTP client, creating it on first use in this loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        if _client is not None and _client_loop is not loop:
+            _discard_client(_client, _client_loop)
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, pool=None),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        )
+        _client_loop = loop
+    return _client
+
+
+def _discard_client(
+    client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None
+) -> None:
+    """Release a client left behind by another event loop.
+
+    Its connections belong to that loop, so they can only be closed there. If
+    the loop is still running (another thread), close the client on it;
+    otherwise (e.g. a finished ``asyncio.run``) nothing can await it any more,
+    so drop its transport and let the pooled sockets go with it.
+    """
+    if client.is_closed:
+        return
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        return
+    del client._transport
+
+
+async def close_client() -> None:
+    """Close the shared FMP HTTP client, if one was created."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
 
 def _require_api_key() -> str:
     if not FMP_API_KEY:
@@ -21,6 +78,21 @@ def _require_api_key() -> str:
     return FMP_API_KEY
 
 
+async def _get(path: str, params: dict[str, str | int]) -> httpx.Response:
+    """GET an FMP `/stable/` endpoint with the API key."""
+    api_key = _require_api_key()
+    response = await _get_client().get(
+        f"{FMP_BASE_URL}/stable/{path}", params={**params, "apikey": api_key}
+    )
+    response.raise_for_status()
+    return response
+
+
+async def _get_json(path: str, params: dict[str, str | int]) -> list[dict]:
+    """GET an FMP `/stable/` endpoint and return the JSON list."""
+    return (await _get(path, params)).json()
+
+
 async def fetch_index_prices(
     index: StockIndex, from_date: date | None = None
 ) -> list[FMPFullPrice]:
@@ -33,7 +105,6 @@ async def fetch_index_prices(
 
     NASDAQ still uses the raw ^IXIC index (not adjusted, no dividend reinvestment).
     """
-    api_key = _require_api_key()
     match index:
         case StockIndex.SP500:
             symbol = "SPY"
@@ -45,74 +116,57 @@ async def fetch_index_prices(
             raise ValueError(f"Unsupported index: {index}")
     from_str = from_date.isoformat() if from_date else "2011-01-01"
     logger.info(f"Fetching index prices for {index.value} ({symbol}) from {from_str}")
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{FMP_BASE_URL}/stable/{endpoint}",
-            params={"symbol": symbol.upper(), "apikey": api_key, "from": from_str},
-        )
-        response.raise_for_status()
-        data: list[dict] = response.json()
-        if endpoint.endswith("dividend-adjusted"):
-            # Map FMPAdjustedStockPrice fields onto FMPFullPrice for uniform
-            # downstream handling (save_index_prices expects FMPFullPrice).
-            from stockidea.types import FMPAdjustedStockPrice
-
-            adjusted = [FMPAdjustedStockPrice.model_validate(item) for item in data]
-            return [
-                FMPFullPrice(
-                    symbol=p.symbol,
-                    date=p.date,
-                    open=p.adjOpen,
-                    high=p.adjHigh,
-                    low=p.adjLow,
-                    close=p.adjClose,
-                    volume=p.volume,
-                )
-                for p in adjusted
-            ]
-        return [FMPFullPrice.model_validate(item) for item in data]
+    response = await _get(endpoint, {"symbol": symbol.upper(), "from": from_str})
+    if endpoint.endswith("dividend-adjusted"):
+        # Map FMPAdjustedStockPrice fields onto FMPFullPrice for uniform
+        # downstream handling (save_index_prices expects FMPFullPrice).
+        adjusted = _ADJUSTED_PRICES_ADAPTER.validate_json(response.content)
+        return [
+            FMPFullPrice(
+                symbol=p.symbol,
+                date=p.date,
+                open=p.adjOpen,
+                high=p.adjHigh,
+                low=p.adjLow,
+                close=p.adjClose,
+                volume=p.volume,
+            )
+            for p in adjusted
+        ]
+    return _FULL_PRICES_ADAPTER.validate_json(response.content)
 
 
 async def fetch_stock_prices(
     symbol: str, from_date: date | None = None
 ) -> list[FMPAdjustedStockPrice]:
-    api_key = _require_api_key()
     from_str = from_date.isoformat() if from_date else "2011-01-01"
     logger.info(f"Fetching stock prices for {symbol} from {from_str}")
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{FMP_BASE_URL}/stable/historical-price-eod/dividend-adjusted",
-            params={"symbol": symbol.upper(), "apikey": api_key, "from": from_str},
-        )
-        response.raise_for_status()
-
-        data: list[dict] = response.json()
+    response = await _get(
+        "historical-price-eod/dividend-adjusted",
+        {"symbol": symbol.upper(), "from": from_str},
+    )
 
-        prices = [FMPAdjustedStockPrice.model_validate(item) for item in data]
-        # Sort by date, from newest to oldest
-        return sorted(prices, key=lambda x: x.date, reverse=True)
+    prices = _ADJUSTED_PRICES_ADAPTER.validate_json(response.content)
+    # Sort by date, from newest to oldest
+    return sorted(prices, key=lambda x: x.date, reverse=True)
 
 
 async def fetch_sma(
     symbol: str, period_length: int, from_date: date | None = None
 ) -> list[tuple[date, float]]:
     """Fetch daily SMA series from FMP. Returns list of (date, sma) sorted ascending."""
-    api_key = _require_api_key()
+    upper_symbol = symbol.upper()
     from_str = from_date.isoformat() if from_date else "2011-01-01"
-    logger.info(f"Fetching SMA({period_length}) for {symbol.upper()} from {from_str}")
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{FMP_BASE_URL}/stable/technical-indicators/sma",
-            params={
-                "symbol": symbol.upper(),
-                "periodLength": period_length,
-                "timeframe": "1day",
-                "apikey": api_key,
-                "from": from_str,
-            },
-        )
-        response.raise_for_status()
-        data: list[dict] = response.json()
+    logger.info(f"Fetching SMA({period_length}) for {upper_symbol} from {from_str}")
+    data = await _get_json(
+        "technical-indicators/sma",
+        {
+            "symbol": upper_symbol,
+            "periodLength": period_length,
+            "timeframe": "1day",
+            "from": from_str,
+        },
+    )
 
     rows: list[tuple[date, float]] = []
     for item in data:
@@ -129,55 +183,33 @@ async def fetch_sma(
 
 async def fetch_company_profile(symbol: str) -> dict | None:
     """Fetch FMP company profile (description, industry, sector, ceo, etc.). Returns None if unknown."""
-    api_key = _require_api_key()
     logger.info(f"Fetching company profile for {symbol}")
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{FMP_BASE_URL}/stable/profile",
-            params={"symbol": symbol.upper(), "apikey": api_key},
-        )
-        response.raise_for_status()
-        data: list[dict] = response.json()
-        return data[0] if data else None
+    data = await _get_json("profile", {"symbol": symbol.upper()})
+    return data[0] if data else None
 
 
 async def fetch_stock_peers(symbol: str) -> list[str]:
     """Fetch peer/competitor symbols for a given stock. Returns [] if none."""
-    api_key = _require_api_key()
     logger.info(f"Fetching stock peers for {symbol}")
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{FMP_BASE_URL}/stable/stock-peers",
-            params={"symbol": symbol.upper(), "apikey": api_key},
-        )
-        response.raise_for_status()
-        data: list[dict] = response.json()
-        # FMP returns a list of objects with a `symbol` field for each peer
-        return [item["symbol"] for item in data if "symbol" in item]
+    data = await _get_json("stock-peers", {"symbol": symbol.upper()})
+    # FMP returns a list of objects with a `symbol` field for each peer
+    return [item["symbol"] for item in data if "symbol" in item]
 
 
 async def fetch_historical_constituent(index: StockIndex) -> list[ConstituentChange]:
-    api_key = _require_api_key()
     logger.info(f"Fetching historical constituent for {index.value}")
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(
-            f"{FMP_BASE_URL}/stable/historical-{index.value}-constituent",
-            params={"apikey": api_key},
-        )
-        response.raise_for_status()
-
-        data: list[dict] = response.json()
-
-        changes = sorted(
-            [
-                ConstituentChange(
-                    date=date.fromisoformat(change["date"]),
-                    added_symbol=change.get("symbol", ""),
-                    removed_symbol=change.get("removedTicker", ""),
-                )
-                for change in data
-            ],
-            key=lambda x: x.date,
-        )
-
-        return changes
+    data = await _get_json(f"historical-{index.value}-constituent", {})
+
+    changes = sorted(
+        [
+            ConstituentChange(
+                date=date.fromisoformat(change["date"]),
+                added_symbol=change.get("symbol", ""),
+                removed_symbol=change.get("removedTicker", ""),
+            )
+            for change in data
+        ],
+        key=lambda x: x.date,
+    )
+
+    return changes
@@ -2,9 +2,11 @@
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import TypeAdapter
 
 from stockidea.datasource import fmp
 from stockidea.datasource import service as datasource_service
@@ -15,10 +17,25 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_PRICE_LIST_ADAPTER = TypeAdapter(list[StockPrice])
 
-@router.get("/snp500")
-async def get_snp500_prices() -> list[dict]:
+# ~13 years of daily bars that only gain one row per trading day — serve the
+# encoded JSON body from memory for a few minutes instead of re-reading and
+# re-encoding it.
+_SNP500_CACHE_TTL_SECONDS = 300
+_snp500_cache: tuple[float, bytes] | None = None
+
+
+@router.get("/snp500", response_model=list[StockPrice])
+async def get_snp500_prices() -> Response:
     """Fetch and return S&P 500 historical price data."""
+    global _snp500_cache
+    if (
+        _snp500_cache is not None
+        and time.monotonic() - _snp500_cache[0] < _SNP500_CACHE_TTL_SECONDS
+    ):
+        return Response(content=_snp500_cache[1], media_type="application/json")
+
     async with conn.get_db_session() as db_session:
         try:
             prices = await datasource_service.get_index_prices(
@@ -27,12 +44,17 @@ async def get_snp500_prices() -> list[dict]:
                 datetime.now() - timedelta(weeks=700),
                 datetime.now(),
             )
-            return [price.model_dump() for price in prices]
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Failed to fetch S&P 500 data: {str(e)}"
             )
 
+    # Encode to JSON bytes once in pydantic-core; cache hits skip FastAPI's
+    # per-row jsonable_encoder pass entirely.
+    payload = _PRICE_LIST_ADAPTER.dump_json(prices)
+    _snp500_cache = (time.monotonic(), payload)
+    return Response(content=payload, media_type="application/json")
+
 
 @router.get("/stocks/{symbol}/profile")
 async def get_stock_profile(symbol: str) -> dict:
@@ -60,15 +82,19 @@ async def get_stock_profile(symbol: str) -> dict:
     return {"symbol": sym, "profile": profile, "peers": peers}
 
 
-@router.get("/stocks/{symbol}/prices")
+@router.get("/stocks/{symbol}/prices", response_model=list[StockPrice])
 async def get_stock_prices(
     symbol: str,
     from_date: str = Query(
         default=None, alias="from", description="Start date YYYY-MM-DD"
     ),
     to_date: str = Query(default=None, alias="to", description="End date YYYY-MM-DD"),
-) -> list[StockPrice]:
-    """Return daily price history for a stock symbol."""
+) -> Response:
+    """Return daily price history for a stock symbol.
+
+    Encoded to JSON bytes in pydantic-core, like /snp500 — years of daily bars
+    otherwise go through jsonable_encoder and stdlib json row by row.
+    """
     to_dt = (
         datetime.strptime(to_date, "%Y-%m-%d").date()
         if to_date
@@ -85,12 +111,14 @@ async def get_stock_prices(
             prices = await datasource_service.get_stock_price_history(
                 db_session, symbol.upper(), from_dt, to_dt
             )
-            return prices
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to fetch prices for {symbol}: {str(e)}",
             )
+    return Response(
+        content=_PRICE_LIST_ADAPTER.dump_json(prices), media_type="application/json"
+    )
 
 
 @router.get("/stocks/{symbol}/sma")
@@ -128,13 +156,14 @@ async def get_stock_sma(
     )
 
     # Sequential — a single AsyncSession can't service concurrent statements.
+    upper_symbol = symbol.upper()
     series_per_period: list[list[tuple]] = []
     async with conn.get_db_session() as db_session:
         try:
             for p in period_list:
                 series_per_period.append(
                     await datasource_service.get_sma_series(
-                        db_session, symbol.upper(), p, from_dt, to_dt
+                        db_session, upper_symbol, p, from_dt, to_dt
                     )
                 )
         except Exception as e:
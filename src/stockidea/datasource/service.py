@@ -6,14 +6,27 @@ Provides:
 - Batch refresh orchestration (CLI / startup)
 """
 
+import asyncio
+import contextlib
 import logging
-from datetime import date, timedelta
-
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+import httpx
+import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from stockidea.datasource import fmp
 from stockidea.datasource.database import conn, queries
-from stockidea.types import ConstituentChange, StockIndex, StockPrice
+from stockidea.types import (
+    ConstituentChange,
+    FMPAdjustedStockPrice,
+    StockIndex,
+    StockPrice,
+)
 
 # Match the staleness threshold in indicators/calculator.py — a constituent
 # whose latest price is older than this is treated as delisted.
@@ -27,43 +40,158 @@ SUPPORTED_INDEXES = [StockIndex.SP500, StockIndex.NASDAQ]
 SMA_PERIODS_STOCK = [20, 50, 100, 200]
 SMA_PERIODS_INDEX = [50, 200]
 
+# Same 1-day TTL as the queries.is_*_fresh helpers.
+_FRESH_TTL = timedelta(days=1)
+
+# In-process copy of each index's constituent change history. get_constituent_at
+# runs once per rebalance in a backtest, while the history itself only changes on
+# the daily refresh.
+_CONSTITUENT_CACHE_TTL_SECONDS = 3600
+
+
+@dataclass(slots=True)
+class _ConstituentHistory:
+    """Date-sorted change log with precomputed membership snapshots.
+
+    Symbols are interned to their position in the sorted symbol universe, so a
+    membership set is an int bitmask: the whole timeline is one and-not/or per
+    change, and decoding the set bits in order yields the members already sorted.
+    """
+
+    changes: list[ConstituentChange]
+    loaded_at: float = field(default_factory=time.monotonic)
+    # Change dates as ordinals: bisect compares plain ints, not date objects
+    _date_ordinals: list[int] = field(init=False)
+    # Sorted universe of every symbol seen in the change log; bit i is symbols[i]
+    symbols: tuple[str, ...] = field(init=False)
+    # Membership bitmask after the first n changes, at index n
+    _masks: list[int] = field(init=False)
+    # Decoded members, filled in the first time a mask is asked for
+    snapshots: dict[int, tuple[str, ...]] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._date_ordinals = [change.date.toordinal() for change in self.changes]
+        self.symbols = tuple(
+            sorted(
+                {c.added_symbol for c in self.changes if c.added_symbol}
+                | {c.removed_symbol for c in self.changes if c.removed_symbol}
+            )
+        )
+        bit = {symbol: 1 << i for i, symbol in enumerate(self.symbols)}
+        # Walk the log once; every later lookup is a bisect into this timeline
+        mask = 0
+        self._masks = [mask]
+        for c in self.changes:
+            removed = bit[c.removed_symbol] if c.removed_symbol else 0
+            added = bit[c.added_symbol] if c.added_symbol else 0
+            mask = (mask & ~removed) | added
+            self._masks.append(mask)
+
+    def _decode(self, mask: int) -> tuple[str, ...]:
+        raw = np.frombuffer(
+            mask.to_bytes((len(self.symbols) + 7) // 8, "little"), dtype=np.uint8
+        )
+        bits = np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+        return tuple(self.symbols[i] for i in bits.tolist())
+
+    def members_at(self, target_date: date) -> tuple[str, ...]:
+        n = bisect_right(self._date_ordinals, target_date.toordinal())
+        members = self.snapshots.get(n)
+        if members is None:
+            members = self.snapshots[n] = self._decode(self._masks[n])
+        return members
+
+
+_constituent_cache: dict[StockIndex, _ConstituentHistory] = {}
+
 
 # =============================================================================
 # Ensure-fresh helpers
 # =============================================================================
 
 
-async def ensure_stock_prices_fresh(db_session: AsyncSession, symbol: str) -> None:
-    """Ensure stock price data for a symbol is fresh, fetching from FMP if stale."""
-    if not await queries.is_data_fresh(db_session, symbol):
-        last_fetched = await queries.get_last_fetched_at(db_session, symbol)
+def _is_fresh(last_fetched: datetime | None, through: date | None) -> bool:
+    """Whether data fetched at ``last_fetched`` can serve reads up to ``through``.
+
+    EOD bars before the fetch day never change, so a read that ends before it is
+    served from the DB regardless of age; anything else falls back to the TTL.
+    """
+    if last_fetched is None:
+        return False
+    if isinstance(through, datetime):
+        # Several callers pass datetimes; datetime and date don't compare.
+        through = through.date()
+    if through is not None and through < last_fetched.date():
+        return True
+    return last_fetched > datetime.now() - _FRESH_TTL
+
+
+# Last fetched_at seen per (symbol, SMA period or None for prices). Fetch times
+# only move forward, so a remembered value that already proves freshness lets
+# repeated lookups (every rebalance of a backtest) skip the metadata SELECT.
+_fetched_at_cache: dict[tuple[str, int | None], datetime] = {}
+
+
+def _known_fresh(key: tuple[str, int | None], through: date | None) -> bool:
+    return _is_fresh(_fetched_at_cache.get(key), through)
+
+
+def _remember_if_fresh(
+    key: tuple[str, int | None], last_fetched: datetime | None, through: date | None
+) -> bool:
+    if last_fetched is None or not _is_fresh(last_fetched, through):
+        return False
+    _fetched_at_cache[key] = last_fetched
+    return True
+
+
+async def ensure_stock_prices_fresh(
+    db_session: AsyncSession, symbol: str, through: date | None = None
+) -> None:
+    """Ensure stock price data for a symbol is fresh, fetching from FMP if stale.
+
+    ``through`` is the last date the caller will read; history ending before the
+    last fetch is never refetched.
+    """
+    key = (symbol.upper(), None)
+    if _known_fresh(key, through):
+        return
+    last_fetched = await queries.get_last_fetched_at(db_session, symbol)
+    if not _remember_if_fresh(key, last_fetched, through):
         from_date = last_fetched.date() if last_fetched else None
         fmp_prices = await fmp.fetch_stock_prices(symbol, from_date=from_date)
         await queries.save_stock_prices(db_session, symbol, fmp_prices)
 
 
 async def ensure_index_prices_fresh(
-    db_session: AsyncSession, index: StockIndex
+    db_session: AsyncSession, index: StockIndex, through: date | None = None
 ) -> None:
     """Ensure index price data is fresh, fetching from FMP if stale."""
-    if not await queries.is_data_fresh(db_session, index.value):
-        last_fetched = await queries.get_last_fetched_at(db_session, index.value)
+    key = (index.value, None)
+    if _known_fresh(key, through):
+        return
+    last_fetched = await queries.get_last_fetched_at(db_session, index.value)
+    if not _remember_if_fresh(key, last_fetched, through):
         from_date = last_fetched.date() if last_fetched else None
         fmp_prices = await fmp.fetch_index_prices(index, from_date=from_date)
         await queries.save_index_prices(db_session, index, fmp_prices)
 
 
 async def ensure_stock_sma_fresh(
-    db_session: AsyncSession, symbol: str, period_length: int
+    db_session: AsyncSession,
+    symbol: str,
+    period_length: int,
+    through: date | None = None,
 ) -> None:
     """Ensure cached SMA data for (symbol, period_length) is fresh.
 
     `symbol` accepts both stock tickers and FMP index symbols (e.g. "^GSPC").
     """
-    if not await queries.is_sma_fresh(db_session, symbol, period_length):
-        last_fetched = await queries.get_sma_fetched_at(
-            db_session, symbol, period_length
-        )
+    key = (symbol.upper(), period_length)
+    if _known_fresh(key, through):
+        return
+    last_fetched = await queries.get_sma_fetched_at(db_session, symbol, period_length)
+    if not _remember_if_fresh(key, last_fetched, through):
         from_date = last_fetched.date() if last_fetched else None
         rows = await fmp.fetch_sma(symbol, period_length, from_date=from_date)
         await queries.save_stock_sma(db_session, symbol, period_length, rows)
@@ -86,7 +214,7 @@ async def get_sma_series(
     to_date: date,
 ) -> list[tuple[date, float]]:
     """Return cached SMA values for a (symbol, period_length) over a date range."""
-    await ensure_stock_sma_fresh(db_session, symbol, period_length)
+    await ensure_stock_sma_fresh(db_session, symbol, period_length, through=to_date)
     return await queries.load_stock_sma(
         db_session, symbol, period_length, from_date, to_date
     )
@@ -99,22 +227,27 @@ async def get_sma_at_date(
     target_date: date,
 ) -> float | None:
     """Return SMA value on or just before target_date, or None if not available."""
-    await ensure_stock_sma_fresh(db_session, symbol, period_length)
+    await ensure_stock_sma_fresh(db_session, symbol, period_length, through=target_date)
     return await queries.get_sma_at_or_before(
         db_session, symbol, period_length, target_date
     )
 
 
-async def ensure_constituent_data_fresh(
+async def _load_constituent_history(
     db_session: AsyncSession, index: StockIndex
-) -> list[ConstituentChange]:
-    """Ensure constituent data is fresh, fetching from FMP if stale. Returns changes."""
-    cached = await queries.load_constituent_changes(db_session, index)
-    if cached is not None:
-        return cached
-    changes = await fmp.fetch_historical_constituent(index)
-    await queries.save_constituent_changes(db_session, index, changes)
-    return changes
+) -> _ConstituentHistory:
+    """Constituent change history for an index, cached in-process."""
+    history = _constituent_cache.get(index)
+    if (
+        history is None
+        or time.monotonic() - history.loaded_at >= _CONSTITUENT_CACHE_TTL_SECONDS
+    ):
+        changes = await queries.load_constituent_changes(db_session, index)
+        if changes is None:
+            changes = await fmp.fetch_historical_constituent(index)
+            await queries.save_constituent_changes(db_session, index, changes)
+        history = _constituent_cache[index] = _ConstituentHistory(changes)
+    return history
 
 
 # =============================================================================
@@ -126,7 +259,7 @@ async def get_index_prices(
     db_session: AsyncSession, index: StockIndex, from_date: date, to_date: date
 ) -> list[StockPrice]:
     """Get index prices for a date range, fetching from FMP if stale."""
-    await ensure_index_prices_fresh(db_session, index)
+    await ensure_index_prices_fresh(db_session, index, through=to_date)
     return await queries.get_prices_by_date_range(
         db_session, index.value, from_date, to_date
     )
@@ -139,7 +272,7 @@ async def get_index_price_at_date(
     nearest: bool = False,
 ) -> StockPrice:
     """Get index price at a specific date, fetching from FMP if stale."""
-    await ensure_index_prices_fresh(db_session, index)
+    await ensure_index_prices_fresh(db_session, index, through=target_date)
     return await queries.get_price_by_date(
         db_session, index.value, target_date, nearest
     )
@@ -149,20 +282,91 @@ async def get_stock_price_history(
     db_session: AsyncSession, symbol: str, from_date: date, to_date: date
 ) -> list[StockPrice]:
     """Get stock price history for a date range, fetching from FMP if stale."""
-    await ensure_stock_prices_fresh(db_session, symbol)
+    await ensure_stock_prices_fresh(db_session, symbol, through=to_date)
     return await queries.get_prices_by_date_range(
         db_session, symbol, from_date, to_date
     )
 
 
+async def get_stock_price_histories(
+    db_session: AsyncSession, symbols: list[str], from_date: date, to_date: date
+) -> dict[str, list[StockPrice]]:
+    """Batch ``get_stock_price_history`` with one price query, keyed by uppercased symbol.
+
+    Each symbol's prices come back in ascending date order.
+    """
+    for symbol in symbols:
+        await ensure_stock_prices_fresh(db_session, symbol, through=to_date)
+    return await queries.get_prices_per_symbol(db_session, symbols, from_date, to_date)
+
+
+async def get_last_refresh_at(db_session: AsyncSession) -> datetime | None:
+    """When price, SMA or constituent data was last fetched, by any process."""
+    return await queries.get_last_data_refresh_at(db_session)
+
+
+async def get_index_price_history(
+    db_session: AsyncSession, index: StockIndex, from_date: date, to_date: date
+) -> list[StockPrice]:
+    """Get index prices for a date range in ascending date order, fetching from FMP if stale."""
+    await ensure_index_prices_fresh(db_session, index, through=to_date)
+    histories = await queries.get_prices_per_symbol(
+        db_session, [index.value], from_date, to_date
+    )
+    return histories.get(index.value.upper(), [])
+
+
+async def get_stock_close_series_batch(
+    db_session: AsyncSession, symbols: list[str], from_date: date, to_date: date
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Get (date ordinals, adjusted closes) arrays per symbol, fetching stale ones from FMP.
+
+    One price query for all symbols, keyed by uppercased symbol.
+
+    A symbol whose refresh fails is logged and left out rather than failing the
+    whole batch.
+    """
+    refreshed: list[str] = []
+    for symbol in symbols:
+        try:
+            await ensure_stock_prices_fresh(db_session, symbol, through=to_date)
+        except (httpx.HTTPError, ValueError) as e:
+            # Fetch failed or FMP sent a malformed payload (pydantic ValidationError)
+            logger.error(f"Failed to refresh prices for {symbol}: {e}")
+            continue
+        except SQLAlchemyError as e:
+            # Each save commits on its own, so only this symbol's write is lost;
+            # rolling back keeps the shared session usable for the rest
+            await db_session.rollback()
+            logger.error(f"Failed to refresh prices for {symbol}: {e}")
+            continue
+        refreshed.append(symbol)
+    return await queries.get_close_series_per_symbol(
+        db_session, refreshed, from_date, to_date
+    )
+
+
 async def get_stock_price_at_date(
     db_session: AsyncSession, symbol: str, target_date: date, nearest: bool = False
 ) -> StockPrice:
     """Get stock price at a specific date, fetching from FMP if stale."""
-    await ensure_stock_prices_fresh(db_session, symbol)
+    await ensure_stock_prices_fresh(db_session, symbol, through=target_date)
     return await queries.get_price_by_date(db_session, symbol, target_date, nearest)
 
 
+async def get_stock_prices_at_date(
+    db_session: AsyncSession, symbols: list[str], target_date: date
+) -> dict[str, StockPrice]:
+    """Batch ``get_stock_price_at_date(..., nearest=True)`` with one price query.
+
+    Keyed by uppercased symbol; symbols with no price on/before ``target_date``
+    are absent.
+    """
+    for symbol in symbols:
+        await ensure_stock_prices_fresh(db_session, symbol, through=target_date)
+    return await queries.get_latest_price_per_symbol(db_session, symbols, target_date)
+
+
 async def get_constituent_at(
     db_session: AsyncSession,
     index: StockIndex,
@@ -182,29 +386,17 @@ async def get_constituent_at(
     Pass ``active_only=False`` from data-refresh paths that need the unfiltered
     membership list to drive FMP fetches.
     """
-    changes = await ensure_constituent_data_fresh(db_session, index)
-    symbols: set[str] = set()
-    for change in changes:
-        if change.date > target_date:
-            break
-        if change.removed_symbol:
-            symbols.discard(change.removed_symbol)
-        if change.added_symbol:
-            symbols.add(change.added_symbol)
+    history = await _load_constituent_history(db_session, index)
+    sorted_symbols = list(history.members_at(target_date))
 
     if not active_only:
-        return sorted(symbols)
+        return sorted_symbols
 
-    sorted_symbols = sorted(symbols)
+    cutoff = target_date - timedelta(weeks=_STALE_PRICE_WEEKS)
     latest_dates = await queries.get_latest_price_date_per_symbol(
-        db_session, sorted_symbols, target_date
+        db_session, sorted_symbols, target_date, not_before=cutoff
     )
-    cutoff = target_date - timedelta(weeks=_STALE_PRICE_WEEKS)
-    active = [
-        sym
-        for sym in sorted_symbols
-        if sym in latest_dates and latest_dates[sym] >= cutoff
-    ]
+    active = [sym for sym in sorted_symbols if sym in latest_dates]
     dropped = len(sorted_symbols) - len(active)
     if dropped:
         logger.info(
@@ -226,6 +418,7 @@ async def fetch_constituent_changes(db_session: AsyncSession, index: StockIndex)
     """
     changes = await fmp.fetch_historical_constituent(index)
     await queries.save_constituent_changes(db_session, index, changes)
+    _constituent_cache[index] = _ConstituentHistory(changes)
     logger.info(f"Fetched {len(changes)} constituent changes for {index.value}")
     return len(changes)
 
@@ -243,13 +436,152 @@ async def fetch_index_prices(db_session: AsyncSession, index: StockIndex) -> int
     return len(fmp_prices)
 
 
+# Symbols whose FMP requests (prices plus each stale SMA window) are in flight at
+# once during a refresh. Saves stay sequential because they share one
+# AsyncSession.
+_FETCH_CONCURRENCY = 16
+
+
+@dataclass(slots=True)
+class _SymbolRefresh:
+    """FMP fetches a symbol needs during a refresh, and what came back."""
+
+    symbol: str
+    fetch_prices: bool = False
+    price_from: date | None = None
+    # Stale SMA windows -> date to fetch from (None = full history)
+    sma_from: dict[int, date | None] = field(default_factory=dict)
+    prices: list[FMPAdjustedStockPrice] | None = None
+    sma_rows: dict[int, list[tuple[date, float]]] = field(default_factory=dict)
+    error: Exception | None = None
+
+
+def _plan_symbol_refresh(
+    symbol: str,
+    price_fetched: dict[str, datetime],
+    sma_fetched: dict[tuple[str, int], datetime],
+) -> _SymbolRefresh:
+    """Decide what a symbol needs from the batch-loaded fetch metadata."""
+    upper_symbol = symbol.upper()
+    refresh = _SymbolRefresh(symbol)
+    last_fetched = price_fetched.get(upper_symbol)
+    if not _is_fresh(last_fetched, None):
+        refresh.fetch_prices = True
+        refresh.price_from = last_fetched.date() if last_fetched else None
+    for period_length in SMA_PERIODS_STOCK:
+        sma_last_fetched = sma_fetched.get((upper_symbol, period_length))
+        if not _is_fresh(sma_last_fetched, None):
+            refresh.sma_from[period_length] = (
+                sma_last_fetched.date() if sma_last_fetched else None
+            )
+    return refresh
+
+
+async def _fetch_symbol_refresh(refresh: _SymbolRefresh) -> None:
+    """Run the planned FMP requests for a symbol concurrently.
+
+    Results land on ``refresh`` as they arrive, so one failed request keeps the
+    others; the first failure is re-raised once all have settled.
+    """
+
+    async def fetch_prices() -> None:
+        refresh.prices = await fmp.fetch_stock_prices(
+            refresh.symbol, from_date=refresh.price_from
+        )
+
+    async def fetch_sma(period_length: int, from_date: date | None) -> None:
+        refresh.sma_rows[period_length] = await fmp.fetch_sma(
+            refresh.symbol, period_length, from_date=from_date
+        )
+
+    requests = [fetch_sma(p, from_date) for p, from_date in refresh.sma_from.items()]
+    if refresh.fetch_prices:
+        requests.append(fetch_prices())
+    outcomes = await asyncio.gather(*requests, return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+
+
+async def _save_symbol_refresh(
+    db_session: AsyncSession,
+    refresh: _SymbolRefresh,
+    results: dict[str, int],
+    fetched_at: datetime,
+) -> None:
+    """Persist whatever was fetched for a symbol, then surface any fetch error.
+
+    Writes go into a savepoint of the batch transaction, so a failed save rolls
+    back only this symbol; the caller commits once per batch.
+    """
+    symbol = refresh.symbol
+    try:
+        async with db_session.begin_nested():
+            if refresh.prices is not None:
+                await queries.save_stock_prices(
+                    db_session,
+                    symbol,
+                    refresh.prices,
+                    commit=False,
+                    fetched_at=fetched_at,
+                )
+            for period_length, rows in refresh.sma_rows.items():
+                await queries.save_stock_sma(
+                    db_session,
+                    symbol,
+                    period_length,
+                    rows,
+                    commit=False,
+                    fetched_at=fetched_at,
+                )
+
+        if refresh.prices is not None:
+            results[symbol] = len(refresh.prices)
+            logger.info(f"Fetched {len(refresh.prices)} prices for {symbol}")
+        elif not refresh.fetch_prices:
+            results[symbol] = 0
+
+        if refresh.error is not None:
+            raise refresh.error
+    except Exception as e:
+        logger.error(f"Failed to fetch prices/SMA for {symbol}: {e}")
+        results.setdefault(symbol, 0)
+
+
+async def _fetch_refresh_batch(refreshes: list[_SymbolRefresh]) -> None:
+    """Run a batch's FMP requests concurrently, recording failures per symbol."""
+    outcomes = await asyncio.gather(
+        *(_fetch_symbol_refresh(r) for r in refreshes), return_exceptions=True
+    )
+    for refresh, outcome in zip(refreshes, outcomes):
+        if isinstance(outcome, Exception):
+            refresh.error = outcome
+
+
+async def _save_refresh_batch(
+    db_session: AsyncSession,
+    refreshes: list[_SymbolRefresh],
+    fetching: asyncio.Task[None],
+    results: dict[str, int],
+) -> None:
+    await fetching
+    # Rows committed together share one created_at/fetched_at
+    fetched_at = datetime.now()
+    for refresh in refreshes:
+        await _save_symbol_refresh(db_session, refresh, results, fetched_at)
+    # One commit for the whole batch instead of one per symbol and SMA window
+    await db_session.commit()
+
+
 async def fetch_stock_prices(
     db_session: AsyncSession,
     index: StockIndex,
 ) -> dict[str, int]:
     """Fetch stock prices and SMA series for all current constituents of an index.
 
-    Skips symbols that are already fresh (fetched today).
+    Skips symbols that are already fresh (fetched today). FMP requests for up to
+    ``_FETCH_CONCURRENCY`` symbols run concurrently, overlapping with the DB
+    writes for the previous batch.
 
     Returns:
         Dict mapping symbol to number of prices fetched (0 means already fresh or failed)
@@ -263,25 +595,35 @@ async def fetch_stock_prices(
 
     results: dict[str, int] = {}
 
-    for symbol in symbols:
-        try:
-            if not await queries.is_data_fresh(db_session, symbol):
-                last_fetched = await queries.get_last_fetched_at(db_session, symbol)
-                from_date = last_fetched.date() if last_fetched else None
-                fmp_prices = await fmp.fetch_stock_prices(symbol, from_date=from_date)
-                await queries.save_stock_prices(db_session, symbol, fmp_prices)
-                results[symbol] = len(fmp_prices)
-                logger.info(f"Fetched {len(fmp_prices)} prices for {symbol}")
-            else:
-                results[symbol] = 0
+    # Freshness metadata for every symbol in two queries, not five per symbol
+    price_fetched = await queries.get_last_fetched_at_per_symbol(db_session, symbols)
+    sma_fetched = await queries.get_sma_fetched_at_per_symbol(
+        db_session, symbols, SMA_PERIODS_STOCK
+    )
 
-            for period_length in SMA_PERIODS_STOCK:
-                if not await queries.is_sma_fresh(db_session, symbol, period_length):
-                    await ensure_stock_sma_fresh(db_session, symbol, period_length)
-        except Exception as e:
-            logger.error(f"Failed to fetch prices/SMA for {symbol}: {e}")
-            await db_session.rollback()
-            results.setdefault(symbol, 0)
+    # Pipeline the batches: while one batch's results are written to the DB,
+    # the next batch's FMP requests are already in flight.
+    in_flight: tuple[list[_SymbolRefresh], asyncio.Task[None]] | None = None
+    try:
+        for start in range(0, len(symbols), _FETCH_CONCURRENCY):
+            refreshes = [
+                _plan_symbol_refresh(symbol, price_fetched, sma_fetched)
+                for symbol in symbols[start : start + _FETCH_CONCURRENCY]
+            ]
+            fetching = asyncio.create_task(_fetch_refresh_batch(refreshes))
+            previous, in_flight = in_flight, (refreshes, fetching)
+            if previous is not None:
+                await _save_refresh_batch(db_session, *previous, results)
+
+        if in_flight is not None:
+            await _save_refresh_batch(db_session, *in_flight, results)
+    finally:
+        # If a save raised, don't leave the next batch's requests running
+        # unobserved after we return
+        if in_flight is not None and not in_flight[1].done():
+            in_flight[1].cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await in_flight[1]
 
     fetched_count = sum(1 for v in results.values() if v > 0)
     skipped_count = sum(1 for v in results.values() if v == 0)
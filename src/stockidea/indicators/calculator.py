@@ -1,101 +1,120 @@
-from dataclasses import dataclass
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 import logging
-from typing import Callable
 
 import numpy as np
-from scipy import stats  # type: ignore
 
-from stockidea.types import StockIndicators, StockPrice
+from stockidea.types import StockIndicators
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class WeeklyData:
-    """Represents one week's stock data."""
+def _daily_week_endings(
+    ordinals: np.ndarray, closes: np.ndarray, date_from: date, date_to: date
+) -> tuple[np.ndarray, np.ndarray]:
+    """Daily rows in [date_from, date_to], ascending, as (week_ending, close) arrays.
 
-    week_ending: date
-    closing_price: float
+    week_ending is the date ordinal of the Friday closing each row's week;
+    weekend rows roll forward to the following Friday.
+    """
+    mask = (ordinals >= date_from.toordinal()) & (ordinals <= date_to.toordinal())
+    ordinals = ordinals[mask]
+    order = np.argsort(ordinals, kind="stable")
+    ordinals = ordinals[order]
+    closes = closes[mask][order]
+
+    # date.weekday() == (ordinal + 6) % 7, so Friday is 4
+    week_endings = ordinals + (4 - (ordinals + 6) % 7) % 7
+    return week_endings, closes
 
 
-def _get_week_ending(d: date) -> date:
-    """Get the Friday of the week for a given date."""
-    days_until_friday = (4 - d.weekday()) % 7
-    if days_until_friday == 0 and d.weekday() != 4:
-        days_until_friday = 7
-    return d + timedelta(days=days_until_friday) if d.weekday() != 4 else d
+def _count_weeks(week_endings: np.ndarray) -> int:
+    """Number of distinct weeks in an ascending week_ending array."""
+    if week_endings.size == 0:
+        return 0
+    return int(np.count_nonzero(np.diff(week_endings))) + 1
 
 
 def _aggregate_to_weekly(
-    prices: list[StockPrice], date_from: date, date_to: date
-) -> list[WeeklyData]:
+    week_endings: np.ndarray, closes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
     """
-    Aggregate daily prices into weekly data points.
+    Aggregate daily prices into weekly (week_ending, close) arrays.
 
     Uses Friday's closing price as the weekly close.
     If Friday data is missing, uses the last available day of that week.
     """
-    filtered = [p for p in prices if p.date >= date_from and p.date <= date_to]
-    filtered.sort(key=lambda x: x.date)
-
-    if not filtered:
-        return []
-
-    weeks: dict[date, list[StockPrice]] = {}
-    for price in filtered:
-        week_end = _get_week_ending(price.date)
-        if week_end not in weeks:
-            weeks[week_end] = []
-        weeks[week_end].append(price)
-
-    weekly_data = []
-    for week_end, week_prices in sorted(weeks.items()):
-        last_day = max(week_prices, key=lambda x: x.date)
-        weekly_data.append(
-            WeeklyData(week_ending=week_end, closing_price=last_day.adj_close)
-        )
+    last_in_week = np.flatnonzero(np.append(np.diff(week_endings) != 0, True))
+    return week_endings[last_in_week], closes[last_in_week]
 
-    return weekly_data
 
+def _lag_pct_changes(closes: np.ndarray, lag: int) -> np.ndarray:
+    """% change between each close and the close `lag` weeks earlier.
 
-def _calculate_pct_change(old: float, new: float) -> float:
-    """Percentage change from old to new value."""
-    if old == 0:
-        return 0.0
-    return ((new - old) / old) * 100
+    A zero base yields 0.0 rather than inf/nan.
+    """
+    if len(closes) <= lag:
+        return np.empty(0)
+    old = closes[:-lag]
+    return (
+        np.divide(closes[lag:] - old, old, out=np.zeros_like(old), where=old != 0) * 100
+    )
 
 
-def _pt_change(weekly_data: list[WeeklyData], n: int) -> float:
+def _pt_change(closes: np.ndarray, n: int) -> float:
     """Point-to-point % change over the last n weeks."""
-    n = min(n, len(weekly_data) - 1)
+    n = min(n, len(closes) - 1)
     if n <= 0:
         return 0.0
-    return _calculate_pct_change(
-        weekly_data[-n - 1].closing_price, weekly_data[-1].closing_price
-    )
+    old = closes[-n - 1]
+    if old == 0:
+        return 0.0
+    return float((closes[-1] - old) / old * 100)
+
+
+@lru_cache(maxsize=64)
+def _regression_constants(n: int) -> tuple[np.ndarray, float]:
+    """Centered x (0..n-1 minus its mean) and its sum of squares for an n-point fit.
+
+    Depends only on n, so it is shared across every symbol with the same window.
+    The returned array is read-only.
+    """
+    dx = np.arange(n, dtype=float) - (n - 1) / 2
+    dx.setflags(write=False)
+    return dx, float(dx @ dx)
+
 
+def _ols_slope_r2(y: np.ndarray) -> tuple[float, float]:
+    """Least-squares slope of y against 0..n-1 and R².
 
-def _linregress_slope_pct_r2(window: list[WeeklyData]) -> tuple[float, float]:
+    Degenerate cases follow scipy.stats.linregress: R² is nan for a flat series.
+    """
+    dx, sxx = _regression_constants(len(y))
+    dy = y - y.mean()
+    sxy = float(dx @ dy)
+    syy = float(dy @ dy)
+    if syy == 0:
+        r = float("nan") if sxy == 0 else 0.0
+    else:
+        r = float(np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0))
+    return sxy / sxx, r * r
+
+
+def _linregress_slope_pct_r2(closes: np.ndarray) -> tuple[float, float]:
     """Linear regression slope (% of window starting price per week) and R²."""
-    if len(window) < 3:
+    if len(closes) < 3:
         return 0.0, 0.0
-    x = np.arange(len(window))
-    y = np.array([w.closing_price for w in window])
-    slope, _, r_value, _, _ = stats.linregress(x, y)
-    base = window[0].closing_price
+    slope, r_squared = _ols_slope_r2(closes)
+    base = closes[0]
     slope_pct = float((slope / base) * 100) if base != 0 else 0.0
-    return slope_pct, float(r_value**2)
+    return slope_pct, r_squared
 
 
-def _log_slope_r2(window: list[WeeklyData]) -> tuple[float, float]:
+def _log_slope_r2(closes: np.ndarray) -> tuple[float, float]:
     """Log-price linear regression slope and R²."""
-    if len(window) < 3:
+    if len(closes) < 3:
         return 0.0, 0.0
-    x = np.arange(len(window))
-    y = np.log(np.array([w.closing_price for w in window]))
-    slope, _, r_value, _, _ = stats.linregress(x, y)
-    return float(slope), float(r_value**2)
+    return _ols_slope_r2(np.log(closes))
 
 
 def _max_drawdown_pct(prices: np.ndarray) -> float:
@@ -107,49 +126,53 @@ def _max_drawdown_pct(prices: np.ndarray) -> float:
     return float(-np.min(drawdowns))
 
 
-def _pct_positive(changes: list[float]) -> float:
+def _pct_positive(changes: np.ndarray) -> float:
     """Fraction of values greater than zero."""
-    return sum(1 for c in changes if c > 0) / len(changes) if changes else 0.0
+    return float(np.count_nonzero(changes > 0) / changes.size) if changes.size else 0.0
 
 
-def _tail(seq: list, n: int) -> list:
-    """Last min(n, len(seq)) items."""
-    return seq[-min(n, len(seq)) :] if seq else []
-
-
-def compute_stock_indicators(
+def compute_stock_indicators_from_series(
     symbol: str,
-    prices: list[StockPrice],
+    ordinals: np.ndarray,
+    closes: np.ndarray,
     from_date: datetime,
     to_date: datetime,
     sma_lookup: dict[int, float | None] | None = None,
 ) -> StockIndicators:
-    """Analyze stock price data and return weekly indicators.
+    """Analyze a stock's daily closes and return weekly indicators.
+
+    Takes column arrays: daily date ordinals and adjusted closes, in any order.
 
     Optional inputs:
         sma_lookup: pre-loaded SMA value at `to_date` for each window
             (20/50/100/200). Missing/None windows produce 0.0 for the related fields.
     """
     sma_lookup = sma_lookup or {}
-    if not prices:
+    if ordinals.size == 0:
         raise ValueError(
             f"Insufficient data for {symbol} from {from_date.date()} to {to_date.date()}: "
             f"no prices in range (likely delisted or never ingested)"
         )
 
-    weekly_data = _aggregate_to_weekly(
-        prices, date_from=from_date.date(), date_to=to_date.date()
+    week_endings, daily_close = _daily_week_endings(
+        ordinals, closes, date_from=from_date.date(), date_to=to_date.date()
     )
 
-    if len(weekly_data) < 5:
+    # Bail out on thin histories (new listings, delistings) before building bars
+    n_weeks = _count_weeks(week_endings)
+    if n_weeks < 5:
         raise ValueError(
             f"Insufficient data for {symbol} from {from_date.date()} to {to_date.date()}: "
-            f"only {len(weekly_data)} weekly bars, need ≥5 "
-            f"(have {len(prices)} daily rows from {prices[-1].date} to {prices[0].date})"
+            f"only {n_weeks} weekly bars, need ≥5 "
+            f"(have {ordinals.size} daily rows from "
+            f"{date.fromordinal(int(ordinals.min()))} to {date.fromordinal(int(ordinals.max()))})"
         )
 
+    # The weekly series stays in numpy end to end; no per-week Python objects
+    weekly_endings, weekly_close = _aggregate_to_weekly(week_endings, daily_close)
+
     cutoff = (to_date - timedelta(weeks=4)).date()
-    last_week_ending = weekly_data[-1].week_ending
+    last_week_ending = date.fromordinal(int(weekly_endings[-1]))
     if last_week_ending < cutoff:
         weeks_stale = (to_date.date() - last_week_ending).days // 7
         raise ValueError(
@@ -158,33 +181,17 @@ def compute_stock_indicators(
             f"cutoff is {cutoff} — likely delisted or trading halted)"
         )
 
-    total_weeks = len(weekly_data)
-    weekly_close = np.array([w.closing_price for w in weekly_data])
+    total_weeks = len(weekly_close)
 
     # Period-over-period change series
-    weekly_changes = [
-        _calculate_pct_change(
-            weekly_data[i - 1].closing_price, weekly_data[i].closing_price
-        )
-        for i in range(1, len(weekly_data))
-    ]
-    biweekly_changes = [
-        _calculate_pct_change(
-            weekly_data[i - 2].closing_price, weekly_data[i].closing_price
-        )
-        for i in range(2, len(weekly_data))
-    ]
-    monthly_changes = [
-        _calculate_pct_change(
-            weekly_data[i - 4].closing_price, weekly_data[i].closing_price
-        )
-        for i in range(4, len(weekly_data))
-    ]
+    weekly_changes = _lag_pct_changes(weekly_close, 1)
+    biweekly_changes = _lag_pct_changes(weekly_close, 2)
+    monthly_changes = _lag_pct_changes(weekly_close, 4)
 
     # Slope & R² per window (linear)
-    w13 = _tail(weekly_data, 13)
-    w26 = _tail(weekly_data, 26)
-    w52 = weekly_data
+    w13 = weekly_close[-13:]
+    w26 = weekly_close[-26:]
+    w52 = weekly_close
     slope_pct_13w, r_squared_13w = _linregress_slope_pct_r2(w13)
     slope_pct_26w, r_squared_26w = _linregress_slope_pct_r2(w26)
     slope_pct_52w, r_squared_52w = _linregress_slope_pct_r2(w52)
@@ -195,7 +202,7 @@ def compute_stock_indicators(
     log_slope_52w, log_r_squared_52w = _log_slope_r2(w52)
 
     # 4-week R² (short-term trend consistency); slope at 4w is too noisy to keep
-    w4 = _tail(weekly_data, 4)
+    w4 = weekly_close[-4:]
     _, r_squared_4w = _linregress_slope_pct_r2(w4)
 
     # Max drawdown per window
@@ -209,28 +216,22 @@ def compute_stock_indicators(
     max_drawdown_pct_52w = _max_drawdown_pct(weekly_close)
 
     # % up-weeks per window
-    pct_weeks_positive_4w = _pct_positive(_tail(weekly_changes, 4))
-    pct_weeks_positive_13w = _pct_positive(_tail(weekly_changes, 13))
-    pct_weeks_positive_26w = _pct_positive(_tail(weekly_changes, 26))
+    pct_weeks_positive_4w = _pct_positive(weekly_changes[-4:])
+    pct_weeks_positive_13w = _pct_positive(weekly_changes[-13:])
+    pct_weeks_positive_26w = _pct_positive(weekly_changes[-26:])
     pct_weeks_positive_52w = _pct_positive(weekly_changes)
 
     # Volatility (std-dev) over full series
-    return_std_52w = float(np.std(weekly_changes)) if weekly_changes else 0.0
-    negative_changes = [c for c in weekly_changes if c < 0]
-    downside_std_52w = float(np.std(negative_changes)) if negative_changes else 0.0
+    return_std_52w = float(np.std(weekly_changes)) if weekly_changes.size else 0.0
+    negative_changes = weekly_changes[weekly_changes < 0]
+    downside_std_52w = float(np.std(negative_changes)) if negative_changes.size else 0.0
 
     # Momentum acceleration over 13 weeks (recent half slope minus earlier half slope)
     if len(w13) >= 6:
         mid = len(w13) // 2
-        w13_early = w13[:mid]
-        w13_late = w13[mid:]
-        x_early = np.arange(len(w13_early))
-        y_early = np.array([w.closing_price for w in w13_early])
-        s_early, _, _, _, _ = stats.linregress(x_early, y_early)
-        x_late = np.arange(len(w13_late))
-        y_late = np.array([w.closing_price for w in w13_late])
-        s_late, _, _, _, _ = stats.linregress(x_late, y_late)
-        base_price = w13[0].closing_price
+        s_early, _ = _ols_slope_r2(w13[:mid])
+        s_late, _ = _ols_slope_r2(w13[mid:])
+        base_price = w13[0]
         acceleration_pct_13w = (
             float(((s_late - s_early) / base_price) * 100) if base_price != 0 else 0.0
         )
@@ -238,9 +239,8 @@ def compute_stock_indicators(
         acceleration_pct_13w = 0.0
 
     # Distance from 4-week high (always <= 0)
-    w4_prices = np.array([w.closing_price for w in w4]) if w4 else weekly_close[-1:]
-    high_4w = float(np.max(w4_prices))
-    current_price = weekly_data[-1].closing_price
+    high_4w = float(w4.max())
+    current_price = float(weekly_close[-1])
     from_high_pct_4w = (
         float(((current_price - high_4w) / high_4w) * 100) if high_4w != 0 else 0.0
     )
@@ -285,19 +285,21 @@ def compute_stock_indicators(
         log_slope_52w=log_slope_52w,
         log_r_squared_52w=log_r_squared_52w,
         # Point-to-point change
-        change_pct_1w=_pt_change(weekly_data, 1),
-        change_pct_2w=_pt_change(weekly_data, 2),
-        change_pct_4w=_pt_change(weekly_data, 4),
-        change_pct_13w=_pt_change(weekly_data, 13),
-        change_pct_26w=_pt_change(weekly_data, 26),
-        change_pct_52w=_pt_change(weekly_data, 52),
+        change_pct_1w=_pt_change(weekly_close, 1),
+        change_pct_2w=_pt_change(weekly_close, 2),
+        change_pct_4w=_pt_change(weekly_close, 4),
+        change_pct_13w=_pt_change(weekly_close, 13),
+        change_pct_26w=_pt_change(weekly_close, 26),
+        change_pct_52w=_pt_change(weekly_close, 52),
         # Max swing
-        max_jump_pct_1w=max(weekly_changes) if weekly_changes else 0.0,
-        max_drop_pct_1w=-min(weekly_changes) if weekly_changes else 0.0,
-        max_jump_pct_2w=max(biweekly_changes) if biweekly_changes else 0.0,
-        max_drop_pct_2w=-min(biweekly_changes) if biweekly_changes else 0.0,
-        max_jump_pct_4w=max(monthly_changes) if monthly_changes else 0.0,
-        max_drop_pct_4w=-min(monthly_changes) if monthly_changes else 0.0,
+        max_jump_pct_1w=float(weekly_changes.max()) if weekly_changes.size else 0.0,
+        max_drop_pct_1w=-float(weekly_changes.min()) if weekly_changes.size else 0.0,
+        max_jump_pct_2w=float(biweekly_changes.max()) if biweekly_changes.size else 0.0,
+        max_drop_pct_2w=-float(biweekly_changes.min())
+        if biweekly_changes.size
+        else 0.0,
+        max_jump_pct_4w=float(monthly_changes.max()) if monthly_changes.size else 0.0,
+        max_drop_pct_4w=-float(monthly_changes.min()) if monthly_changes.size else 0.0,
         # Volatility std
         return_std_52w=return_std_52w,
         downside_std_52w=downside_std_52w,
@@ -323,35 +325,34 @@ def compute_stock_indicators(
     )
 
 
-def rank_by_expression(
-    items: list[StockIndicators],
-    sort_func: Callable[[StockIndicators], float],
-) -> list[StockIndicators]:
-    """Sort items by a user-defined sort expression.
+def top_indices(scores: np.ndarray, limit: int | None = None) -> np.ndarray:
+    """Positions of the `limit` highest scores, best first, ties by position."""
+    if limit is not None and limit <= 0:
+        return np.empty(0, dtype=np.intp)
+    if limit is None or limit >= len(scores) or np.isnan(scores).any():
+        order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        return np.asarray(order[:limit], dtype=np.intp)
 
-    Items are sorted by score descending (higher = better).
-    """
-    if len(items) <= 1:
-        return items
-
-    scored = [(sort_func(item), item) for item in items]
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [item for _, item in scored]
+    # Everything scoring at least the limit-th best is a candidate; order those by
+    # (score desc, position asc) to reproduce the stable full sort.
+    neg = -scores
+    kth = np.partition(neg, limit - 1)[limit - 1]
+    candidates = np.flatnonzero(neg <= kth)
+    return candidates[np.lexsort((candidates, neg[candidates]))][:limit]
 
 
-def slope_outlier_mask(
-    items: list[StockIndicators], k: float = 3.0
-) -> list[StockIndicators]:
-    """Remove outliers based on the 52-week linear slope using modified Z-score (MAD)."""
-    if not items or len(items) <= 2:
-        return items
+def slope_inliers(slopes: np.ndarray, k: float = 3.0) -> np.ndarray | None:
+    """Inlier mask over the 52-week slope column, by modified Z-score (MAD).
 
-    slopes = np.asarray([i.slope_pct_52w for i in items], dtype=float)
+    None keeps everything.
+    """
+    if len(slopes) <= 2:
+        return None
     median = np.median(slopes)
     mad = np.median(np.abs(slopes - median))
 
     if mad == 0:
-        return items
+        return None
 
     modified_z = 0.6745 * (slopes - median) / mad
-    return [item for item, ok in zip(items, np.abs(modified_z) <= 2.5) if ok]
+    return np.abs(modified_z) <= 2.5
@@ -1,15 +1,18 @@
 """API routes for indicator operations."""
 
+import json
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from stockidea.datasource import service as datasource_service
 from stockidea.datasource.database import conn
 from stockidea.indicators import service as indicators_service
 from stockidea.rule_engine import DEFAULT_SORT, compile_rule, compile_sort
-from stockidea.types import StockIndex
+from stockidea.types import StockIndex, StockIndicators
 
 router = APIRouter()
 
@@ -77,7 +80,7 @@ async def get_analysis(
     sort_expr: Optional[str] = None,
     max_stocks: Optional[int] = None,
     index: StockIndex = StockIndex.SP500,
-) -> dict:
+) -> StreamingResponse:
 
     indicators_date = datetime.strptime(date, "%Y-%m-%d")
 
@@ -101,18 +104,32 @@ async def get_analysis(
                 stock_indicators_batch,
                 rule_func=rule_func,
                 sort_func=sort_func,
+                max_stocks=max_stocks
+                if max_stocks is not None and max_stocks > 0
+                else None,
             )
         except Exception as e:
             raise HTTPException(
                 status_code=400, detail=f"Invalid rule/sort expression: {e}"
             )
 
-        if max_stocks is not None and max_stocks > 0:
-            stock_indicators_batch = stock_indicators_batch[:max_stocks]
+    return StreamingResponse(
+        _stream_indicators(indicators_date, stock_indicators_batch),
+        media_type="application/json",
+    )
 
-    return {
-        "date": indicators_date.strftime("%Y-%m-%d"),
-        "data": [
-            stock_indicator.model_dump() for stock_indicator in stock_indicators_batch
-        ],
-    }
+
+async def _stream_indicators(
+    indicators_date: datetime, stock_indicators_batch: list[StockIndicators]
+) -> AsyncIterator[bytes]:
+    """Yield ``{"date": ..., "data": [...]}`` one row at a time.
+
+    Rows are serialized straight to JSON by pydantic, so the full payload is never
+    held as a dict tree and the client starts receiving bytes right away.
+    """
+    yield b'{"date":' + json.dumps(indicators_date.strftime("%Y-%m-%d")).encode()
+    yield b',"data":['
+    for i, stock_indicator in enumerate(stock_indicators_batch):
+        row = stock_indicator.model_dump_json().encode()
+        yield row if i == 0 else b"," + row
+    yield b"]}"
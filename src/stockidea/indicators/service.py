@@ -1,7 +1,15 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 import logging
+import multiprocessing
+import os
+import time
+import traceback
 from typing import Callable
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -15,30 +23,149 @@ logger = logging.getLogger(__name__)
 # Periods we pre-load SMA for. Mirrors datasource_service.SMA_PERIODS_STOCK.
 _SMA_PERIODS = [20, 50, 100, 200]
 
+# Short-lived cache of list_indicator_dates: the SELECT DISTINCT scans the whole
+# indicators table and is hit on every page load. Dropped whenever we save rows.
+_DATES_CACHE_TTL_SECONDS = 5
+_dates_cache: tuple[float, list[datetime]] | None = None
+
 
 def apply_rule(
     indicators_batch: list[StockIndicators],
     rule_func: Callable[[StockIndicators], bool] | None = None,
     sort_func: Callable[[StockIndicators], float] | None = None,
+    max_stocks: int | None = None,
 ) -> list[StockIndicators]:
-    from stockidea.rule_engine import compile_sort, DEFAULT_SORT
-
-    if rule_func is None:
-        filtered_stocks = list(indicators_batch)
-    else:
-        filtered_stocks = [
-            indicator for indicator in indicators_batch if rule_func(indicator)
-        ]
+    from stockidea.rule_engine import (
+        CompiledRule,
+        CompiledSort,
+        IndicatorColumns,
+        compile_sort,
+        DEFAULT_SORT,
+    )
+
+    # Rule, outlier filter and sort all read the same per-field columns
+    columns = IndicatorColumns(list(indicators_batch))
+    if rule_func is not None:
+        if isinstance(rule_func, CompiledRule):
+            passed = rule_func.select(columns)
+        else:
+            passed = np.flatnonzero([rule_func(item) for item in columns.items])
+        columns = columns.take(passed)
+
+    # Remove outliers based on the linear slope percentage. The mask only looks at
+    # the population, so running it before ranking lets the rank stop at top-N.
+    inliers = calculator.slope_inliers(columns["slope_pct_52w"], k=3.0)
+    if inliers is not None:
+        columns = columns.take(np.flatnonzero(inliers))
 
     # Sort by expression (default: risk-adjusted momentum)
     if sort_func is None:
         sort_func = compile_sort(DEFAULT_SORT)
-    filtered_stocks = calculator.rank_by_expression(filtered_stocks, sort_func)
+    if max_stocks is not None and max_stocks <= 0:
+        return []
+    if len(columns) <= 1:
+        return columns.items
+    if isinstance(sort_func, CompiledSort):
+        scores = sort_func.scores(columns)
+    else:
+        scores = np.fromiter((sort_func(item) for item in columns.items), dtype=float)
+    return [columns.items[i] for i in calculator.top_indices(scores, limit=max_stocks)]
+
+
+# (symbol, date ordinals, closes, SMA lookup, from_date, to_date)
+_IndicatorJob = tuple[
+    str, np.ndarray, np.ndarray, dict[int, float | None], datetime, datetime
+]
+
+# Below this many symbols, pickling the series to a worker costs more than the
+# ~0.5ms of math per symbol it would save.
+_PARALLEL_MIN_JOBS = 64
+_pool: ProcessPoolExecutor | None = None
 
-    # Remove outliers based on the linear slope percentage
-    filtered_stocks = calculator.slope_outlier_mask(filtered_stocks, k=3.0)
 
-    return filtered_stocks
+def _compute_indicator_jobs(jobs: list[_IndicatorJob]) -> list[StockIndicators | str]:
+    """Compute each job's indicators, or the error message when it fails.
+
+    A failure only costs that symbol; the caller logs it and moves on.
+    Module-level so a process pool worker can run it.
+    """
+    outcomes: list[StockIndicators | str] = []
+    for symbol, ordinals, closes, sma_lookup, from_date, to_date in jobs:
+        try:
+            outcomes.append(
+                calculator.compute_stock_indicators_from_series(
+                    symbol=symbol,
+                    ordinals=ordinals,
+                    closes=closes,
+                    from_date=from_date,
+                    to_date=to_date,
+                    sma_lookup=sma_lookup,
+                )
+            )
+        except ValueError as e:
+            # Missing, thin or stale history in the window
+            outcomes.append(str(e))
+        except MemoryError:
+            raise
+        except Exception:  # noqa: BLE001 - one bad series must not sink the batch
+            # Workers can't log to the parent: the traceback travels in the outcome
+            outcomes.append(f"unexpected error\n{traceback.format_exc()}")
+    return outcomes
+
+
+async def _compute_indicators(
+    jobs: list[_IndicatorJob],
+) -> list[StockIndicators | str]:
+    """Run indicator jobs, fanning large batches out across CPU cores.
+
+    A cold date (or a backfill) computes the whole index universe; small
+    top-ups stay in-process.
+    """
+    global _pool
+    workers = os.cpu_count() or 1
+    if len(jobs) < _PARALLEL_MIN_JOBS or workers < 2:
+        return _compute_indicator_jobs(jobs)
+    if _pool is None:
+        # spawn, not fork: the server process has event-loop and driver threads
+        _pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    size = max(16, -(-len(jobs) // workers))
+    loop = asyncio.get_running_loop()
+    try:
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(_pool, _compute_indicator_jobs, jobs[i : i + size])
+                for i in range(0, len(jobs), size)
+            )
+        )
+    except BrokenProcessPool:
+        logger.warning("Indicator worker pool died; computing in-process")
+        _pool = None
+        return _compute_indicator_jobs(jobs)
+    return [outcome for chunk in chunks for outcome in chunk]
+
+
+def shutdown_pool() -> None:
+    """Stop the indicator worker processes, if a large batch ever started them."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+    _pool = None
+
+
+async def _load_sma_lookup(
+    db_session: AsyncSession, symbol: str, indicators_date: datetime
+) -> dict[int, float | None]:
+    """SMA values per period on/before the indicators date; None where unavailable."""
+    sma_lookup: dict[int, float | None] = {}
+    for period_length in _SMA_PERIODS:
+        try:
+            sma_lookup[period_length] = await datasource_service.get_sma_at_date(
+                db_session, symbol, period_length, indicators_date.date()
+            )
+        except Exception as e:
+            logger.warning(f"SMA({period_length}) unavailable for {symbol}: {e}")
+            sma_lookup[period_length] = None
+    return sma_lookup
 
 
 async def get_stock_indicators_batch(
@@ -56,48 +183,71 @@ async def get_stock_indicators_batch(
     from_date = indicators_date - timedelta(weeks=back_period_weeks)
     to_date = indicators_date
 
+    # Indicators persist once computed, so a rebalance date revisited by a later
+    # run is one lookup for the whole universe and only the rule work repeats.
+    stored = await queries.load_stock_indicators_batch(
+        db_session, symbols, indicators_date.date()
+    )
+    loaded = [(symbol, stored.get(symbol.upper())) for symbol in symbols]
+
+    # Price history for every symbol that needs computing, in one range query
+    missing = [symbol for symbol, found in loaded if found is None]
+    series: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    if missing and compute_if_not_exists:
+        series = await datasource_service.get_stock_close_series_batch(
+            db_session, missing, from_date, to_date
+        )
+
+    # SMA context for every symbol to compute (sequential: one session), then the
+    # CPU-bound indicator math for all of them at once
+    jobs: list[_IndicatorJob] = []
+    if compute_if_not_exists:
+        for symbol, found in loaded:
+            symbol_series = series.get(symbol.upper())
+            if found is not None or symbol_series is None:
+                continue
+            sma_lookup = await _load_sma_lookup(db_session, symbol, indicators_date)
+            jobs.append((symbol, *symbol_series, sma_lookup, from_date, to_date))
+    computed = dict(zip((job[0] for job in jobs), await _compute_indicators(jobs)))
+
     results: list[StockIndicators] = []
-    for symbol in symbols:
-        try:
-            stock_indicators = await queries.load_stock_indicators(
-                db_session, symbol, indicators_date.date()
-            )
-            if not stock_indicators and compute_if_not_exists:
-                prices = await datasource_service.get_stock_price_history(
-                    db_session, symbol, from_date, to_date
-                )
-                sma_lookup: dict[int, float | None] = {}
-                for period_length in _SMA_PERIODS:
-                    try:
-                        sma_lookup[
-                            period_length
-                        ] = await datasource_service.get_sma_at_date(
-                            db_session, symbol, period_length, indicators_date.date()
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"SMA({period_length}) unavailable for {symbol}: {e}"
-                        )
-                        sma_lookup[period_length] = None
-
-                stock_indicators = calculator.compute_stock_indicators(
-                    symbol=symbol,
-                    prices=prices,
-                    from_date=indicators_date - timedelta(weeks=back_period_weeks),
-                    to_date=indicators_date,
-                    sma_lookup=sma_lookup,
+    for symbol, stock_indicators in loaded:
+        if stock_indicators is None and symbol in computed:
+            outcome = computed[symbol]
+            if isinstance(outcome, str):
+                logger.error(
+                    f"Error computing stock indicators for {symbol}: {outcome}"
                 )
+                continue
+            try:
                 await queries.save_stock_indicators(
-                    db_session, stock_indicators, indicators_date.date()
+                    db_session, outcome, indicators_date.date()
                 )
+            except Exception as e:
+                logger.error(f"Error computing stock indicators for {symbol}: {e}")
+                continue
+            _invalidate_dates_cache()
+            stock_indicators = outcome
 
-            if stock_indicators:
-                results.append(stock_indicators)
-        except Exception as e:
-            logger.error(f"Error computing stock indicators for {symbol}: {e}")
+        if stock_indicators:
+            results.append(stock_indicators)
 
     return results
 
 
+def _invalidate_dates_cache() -> None:
+    global _dates_cache
+    _dates_cache = None
+
+
 async def list_indicator_dates(db_session: AsyncSession) -> list[datetime]:
-    return await queries.list_indicator_dates(db_session)
+    global _dates_cache
+    if (
+        _dates_cache is not None
+        and time.monotonic() - _dates_cache[0] < _DATES_CACHE_TTL_SECONDS
+    ):
+        return list(_dates_cache[1])
+
+    dates = await queries.list_indicator_dates(db_session)
+    _dates_cache = (time.monotonic(), dates)
+    return list(dates)
@@ -1,15 +1,30 @@
 """Rule engine for evaluating string-based filter expressions on StockIndicators objects."""
 
+import ast
 import re
-from typing import Callable
-
-from simpleeval import SimpleEval  # type: ignore
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable
+
+import numpy as np
+from simpleeval import (  # type: ignore
+    InvalidExpression,
+    SimpleEval,
+    safe_add,
+    safe_mult,
+    safe_power,
+)
 
 from stockidea.types import StockIndicators
 
 
 DEFAULT_SORT = "change_pct_13w / return_std_52w"
 
+# Compiled once for RuleEngine._normalize_rule / extract_involved_keys
+_AND_RE = re.compile(r"\bAND\b", re.IGNORECASE)
+_OR_RE = re.compile(r"\bOR\b", re.IGNORECASE)
+_IDENTIFIER_RE = re.compile(r"\b([a-zA-Z_][a-zA-Z0-9_]*)\b")
+
 # Safe builtins exposed to user-written expressions (rules, sort, stop-loss).
 # simpleeval's defaults omit these; we whitelist a small read-only set.
 SAFE_FUNCTIONS: dict[str, Callable] = {
@@ -20,6 +35,570 @@ SAFE_FUNCTIONS: dict[str, Callable] = {
 }
 
 
+def _try_parse(expression: str) -> ast.AST | None:
+    """Parse an expression up front, or None to leave the error to evaluation."""
+    try:
+        return SimpleEval.parse(expression)
+    except (SyntaxError, ValueError, InvalidExpression):
+        return None
+
+
+# AST nodes an expression may use to be compiled to native bytecode. Anything
+# else (attributes, subscripts, lambdas, ...) stays on the SimpleEval path.
+_NATIVE_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Gt,
+    ast.Lt,
+    ast.GtE,
+    ast.LtE,
+    ast.In,
+    ast.NotIn,
+    ast.IfExp,
+    ast.Call,
+    ast.keyword,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+)
+
+# SimpleEval's size-guarded operators, so native code keeps its limits on
+# huge powers and string repetition.
+_GUARDED_OPS: dict[type[ast.operator], str] = {
+    ast.Add: "_safe_add",
+    ast.Mult: "_safe_mult",
+    ast.Pow: "_safe_power",
+}
+_NATIVE_GLOBALS = {
+    "__builtins__": {},
+    **SAFE_FUNCTIONS,
+    "_safe_add": safe_add,
+    "_safe_mult": safe_mult,
+    "_safe_power": safe_power,
+}
+
+
+class _GuardOperators(ast.NodeTransformer):
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+        self.generic_visit(node)
+        guard = _GUARDED_OPS.get(type(node.op))
+        if guard is None:
+            return node
+        return ast.Call(
+            func=ast.Name(id=guard, ctx=ast.Load()),
+            args=[node.left, node.right],
+            keywords=[],
+        )
+
+
+def _compile_native(expression: str) -> Callable[[StockIndicators], Any] | None:
+    """Compile a whitelisted expression to a Python function over the fields it uses.
+
+    Returns None when the expression doesn't parse or uses anything outside
+    ``_NATIVE_NODES``, unknown names, or calls other than ``SAFE_FUNCTIONS``.
+    """
+    parsed = _try_parse(expression)
+    if not isinstance(parsed, ast.Expr):
+        return None
+    tree = ast.Expression(body=parsed.value)
+    field_names = StockIndicators.model_fields.keys()
+    callees = {
+        id(node.func)
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in SAFE_FUNCTIONS
+    }
+    used: list[str] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _NATIVE_NODES):
+            return None
+        if isinstance(node, ast.Call) and id(node.func) not in callees:
+            return None
+        if isinstance(node, ast.Name) and id(node) not in callees:
+            if node.id not in field_names:
+                return None
+            if node.id not in used:
+                used.append(node.id)
+
+    # lambda <used fields>: <expression>, called with just those attributes
+    func = ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg=name) for name in used],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        body=_GuardOperators().visit(tree).body,
+    )
+    code = compile(
+        ast.fix_missing_locations(ast.Expression(body=func)), "<rule>", "eval"
+    )
+    # Safe to eval: every node and name was whitelisted above
+    native = eval(code, _NATIVE_GLOBALS)
+    if not used:
+        return lambda indicators: native()
+    if len(used) == 1:
+        name = used[0]
+        return lambda indicators: native(getattr(indicators, name))
+    getter = attrgetter(*used)
+    return lambda indicators: native(*getter(indicators))
+
+
+# Numeric fields a rule can read as a float64 column in the vectorized filter
+_NUMERIC_FIELDS = frozenset(
+    name
+    for name, field in StockIndicators.model_fields.items()
+    if field.annotation in (int, float)
+)
+_BATCH_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Gt,
+    ast.Lt,
+    ast.GtE,
+    ast.LtE,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite boolean logic and chained comparisons into elementwise numpy calls."""
+
+    @staticmethod
+    def _np(func: str, args: list[ast.expr]) -> ast.Call:
+        return ast.Call(
+            func=ast.Attribute(
+                value=ast.Name(id="np", ctx=ast.Load()), attr=func, ctx=ast.Load()
+            ),
+            args=args,
+            keywords=[],
+        )
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            # numpy lets nan / 0 through quietly; Python raises for any zero divisor
+            node.right = ast.Call(
+                func=ast.Name(id="_nonzero", ctx=ast.Load()),
+                args=[node.right],
+                keywords=[],
+            )
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.expr:
+        self.generic_visit(node)
+        func = "logical_and" if isinstance(node.op, ast.And) else "logical_or"
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = self._np(func, [result, value])
+        return result
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return self._np("logical_not", [node.operand])
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.expr:
+        self.generic_visit(node)
+        # a < b < c -> (a < b) & (b < c)
+        left = node.left
+        result: ast.expr | None = None
+        for op, right in zip(node.ops, node.comparators):
+            pair = ast.Compare(left=left, ops=[op], comparators=[right])
+            result = pair if result is None else self._np("logical_and", [result, pair])
+            left = right
+        assert result is not None
+        return result
+
+
+def _nonzero(divisor: Any) -> Any:
+    if np.any(np.asarray(divisor) == 0):
+        raise ZeroDivisionError("division by zero")
+    return divisor
+
+
+class IndicatorColumns:
+    """Column-oriented view of a StockIndicators batch.
+
+    Each numeric field is pulled out into one float64 array the first time it
+    is read, so the rule, outlier filter and sort of one screen share columns.
+    """
+
+    def __init__(self, items: list[StockIndicators]) -> None:
+        self.items = items
+        self._columns: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = np.fromiter(
+                (getattr(item, name) for item in self.items),
+                dtype=float,
+                count=len(self.items),
+            )
+        return column
+
+    def take(self, indices: np.ndarray) -> "IndicatorColumns":
+        """Subset of the rows at `indices`, keeping the columns already built."""
+        subset = IndicatorColumns([self.items[i] for i in indices])
+        subset._columns = {
+            name: column[indices] for name, column in self._columns.items()
+        }
+        return subset
+
+
+def _compile_batch(
+    expression: str, boolean_logic: bool = True
+) -> Callable[[IndicatorColumns], np.ndarray | None] | None:
+    """Compile a numeric expression into a function evaluating it over a batch.
+
+    Only arithmetic, comparisons and boolean logic over numeric fields qualify;
+    anything else returns None and callers evaluate row by row. ``and``/``or``/
+    ``not`` become elementwise truth values, which only matches Python when the
+    result is used as a truth value: pass ``boolean_logic=False`` for scores.
+    """
+    parsed = _try_parse(expression)
+    if not isinstance(parsed, ast.Expr):
+        return None
+    tree = ast.Expression(body=parsed.value)
+    used: list[str] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _BATCH_NODES):
+            return None
+        if not boolean_logic and isinstance(node, (ast.BoolOp, ast.Not)):
+            # Python's and/or return an operand, not a bool
+            return None
+        if isinstance(node, ast.Constant) and type(node.value) not in (
+            int,
+            float,
+            bool,
+        ):
+            return None
+        if isinstance(node, ast.Name):
+            if node.id not in _NUMERIC_FIELDS:
+                return None
+            if node.id not in used:
+                used.append(node.id)
+
+    func = ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg=name) for name in used],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        body=_Vectorize().visit(tree).body,
+    )
+    code = compile(
+        ast.fix_missing_locations(ast.Expression(body=func)), "<rule>", "eval"
+    )
+    # Safe to eval: every node and name was whitelisted above
+    vectorized = eval(code, {"__builtins__": {}, "np": np, "_nonzero": _nonzero})
+
+    def evaluate_batch(columns: IndicatorColumns) -> np.ndarray | None:
+        """The expression over every row, or None if any row would raise."""
+        try:
+            with np.errstate(all="raise"):
+                result = vectorized(*(columns[name] for name in used))
+        except (ArithmeticError, TypeError, ValueError):
+            # e.g. a zero divisor or a missing value: the per-row path
+            # reproduces exactly what the scalar evaluation does with it
+            return None
+        return np.broadcast_to(np.asarray(result), (len(columns),))
+
+    return evaluate_batch
+
+
+def _and_clauses(expression: str) -> list[ast.expr] | None:
+    """The operands of a top-level ``and`` chain, or None if it isn't one."""
+    parsed = _try_parse(expression)
+    if (
+        isinstance(parsed, ast.Expr)
+        and isinstance(parsed.value, ast.BoolOp)
+        and isinstance(parsed.value.op, ast.And)
+    ):
+        return parsed.value.values
+    return None
+
+
+# Nodes that can't raise on numeric field values (floats overflow to inf, NaN
+# compares False), so a clause built from them alone is free to move.
+_NON_RAISING_NODES = (
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Gt,
+    ast.Lt,
+    ast.GtE,
+    ast.LtE,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+)
+# Positional argument counts these functions accept on plain numbers without
+# raising: abs(x), min(a, b, ...), max(a, b, ...). min(x) on a float raises.
+_NON_RAISING_FUNCTIONS: dict[str, Callable[[int], bool]] = {
+    "abs": lambda n: n == 1,
+    "min": lambda n: n >= 2,
+    "max": lambda n: n >= 2,
+}
+
+
+def _can_raise(clause: ast.expr) -> bool:
+    callees = {
+        id(node.func)
+        for node in ast.walk(clause)
+        if isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _NON_RAISING_FUNCTIONS
+        and not node.keywords
+        and _NON_RAISING_FUNCTIONS[node.func.id](len(node.args))
+    }
+    for node in ast.walk(clause):
+        if not isinstance(node, _NON_RAISING_NODES):
+            return True
+        if isinstance(node, ast.Call) and id(node.func) not in callees:
+            return True
+        if (
+            isinstance(node, ast.Name)
+            and id(node) not in callees
+            and node.id not in _NUMERIC_FIELDS
+        ):
+            return True
+        if isinstance(node, ast.Constant) and type(node.value) not in (
+            int,
+            float,
+            bool,
+        ):
+            return True
+    return False
+
+
+def _order_clauses(expression: str) -> str:
+    """Move the cheapest operands of a top-level ``and`` chain forward.
+
+    A rule's result is only used for its truth value, so reordering clauses
+    that can't raise doesn't change it; it lets short-circuiting skip the
+    costlier ones on rows a plain comparison already rejects. Clauses that can
+    raise (division, powers, non-numeric fields, ...) stay where they are, and
+    nothing moves across them, so every row still raises or is rejected
+    exactly as the written rule would.
+    """
+    clauses = _and_clauses(expression)
+    if clauses is None:
+        return expression
+    ordered: list[ast.expr] = []
+    run: list[ast.expr] = []
+    for clause in clauses:
+        if _can_raise(clause):
+            ordered += sorted(run, key=lambda c: sum(1 for _ in ast.walk(c)))
+            ordered.append(clause)
+            run = []
+        else:
+            run.append(clause)
+    ordered += sorted(run, key=lambda c: sum(1 for _ in ast.walk(c)))
+    if ordered == clauses:
+        return expression
+    return ast.unparse(ast.BoolOp(op=ast.And(), values=ordered))
+
+
+def _compile_filter_batch(
+    expression: str,
+) -> Callable[[IndicatorColumns], np.ndarray | None] | None:
+    """Like ``_compile_batch``, short-circuiting a top-level ``and`` chain.
+
+    Each clause only runs on the rows every clause before it accepted, in the
+    order ``_order_clauses`` fixed at compile time.
+    """
+    clauses = _and_clauses(expression)
+    if clauses is None:
+        return _compile_batch(expression)
+    batches = [
+        batch
+        for batch in (_compile_batch(ast.unparse(clause)) for clause in clauses)
+        if batch is not None
+    ]
+    if len(batches) < len(clauses):
+        return None
+
+    def evaluate_batch(columns: IndicatorColumns) -> np.ndarray | None:
+        alive = np.arange(len(columns))
+        subset = columns
+        for batch in batches:
+            result = batch(subset)
+            if result is None:
+                return None
+            kept = np.flatnonzero(result.astype(bool))
+            if len(kept) < len(subset):
+                alive = alive[kept]
+                if not len(alive):
+                    break
+                subset = subset.take(kept)
+        mask = np.zeros(len(columns), dtype=bool)
+        mask[alive] = True
+        return mask
+
+    return evaluate_batch
+
+
+class CompiledRule:
+    """A compiled filter rule.
+
+    Callable on one StockIndicators like a plain predicate; ``select`` applies
+    it to a whole batch, as one numpy mask when the rule is purely numeric.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[StockIndicators], bool],
+        batch: Callable[[IndicatorColumns], np.ndarray | None] | None,
+    ) -> None:
+        self._evaluate = evaluate
+        self._batch = batch
+
+    def __call__(self, analysis: StockIndicators) -> bool:
+        return self._evaluate(analysis)
+
+    def select(self, columns: IndicatorColumns) -> np.ndarray:
+        """Positions of the rows in `columns` that pass the rule."""
+        if self._batch is not None and len(columns):
+            result = self._batch(columns)
+            if result is not None:
+                return np.flatnonzero(result.astype(bool))
+        passed = np.fromiter(
+            (self._evaluate(item) for item in columns.items),
+            dtype=bool,
+            count=len(columns),
+        )
+        return np.flatnonzero(passed)
+
+
+class CompiledSort:
+    """A compiled sort expression: per-row score, or a whole batch of scores."""
+
+    def __init__(
+        self,
+        evaluate: Callable[[StockIndicators], float],
+        batch: Callable[[IndicatorColumns], np.ndarray | None] | None,
+    ) -> None:
+        self._evaluate = evaluate
+        self._batch = batch
+
+    def __call__(self, indicators: StockIndicators) -> float:
+        return self._evaluate(indicators)
+
+    def scores(self, columns: IndicatorColumns) -> np.ndarray:
+        if self._batch is not None and len(columns):
+            result = self._batch(columns)
+            if result is not None:
+                return result.astype(float)
+        return np.fromiter(
+            (self._evaluate(item) for item in columns.items),
+            dtype=float,
+            count=len(columns),
+        )
+
+
+def _compile_expression(expression: str) -> Callable[[StockIndicators], Any]:
+    """Compile to native code when possible, else to a reusable SimpleEval."""
+    native = _compile_native(expression)
+    if native is not None:
+        return native
+
+    # Parse once and reuse one evaluator; each call only swaps in the names.
+    # An expression that doesn't parse still fails per call.
+    field_names = tuple(StockIndicators.model_fields.keys())
+    parsed = _try_parse(expression)
+    evaluator = SimpleEval(functions=SAFE_FUNCTIONS)
+
+    if parsed is None:
+        get_fields = attrgetter(*field_names)
+
+        def evaluate(indicators: StockIndicators) -> Any:
+            evaluator.names = dict(zip(field_names, get_fields(indicators)))
+            return evaluator.eval(expression, previously_parsed=parsed)
+
+        return evaluate
+
+    # Tree-walking evaluation is slow enough that a cache keyed on the values of
+    # the fields the expression reads pays off (repeat scoring across sweeps).
+    used = tuple(
+        dict.fromkeys(
+            node.id
+            for node in ast.walk(parsed)
+            if isinstance(node, ast.Name) and node.id in StockIndicators.model_fields
+        )
+    )
+
+    @lru_cache(maxsize=8192)
+    def evaluate_values(values: tuple) -> Any:
+        evaluator.names = dict(zip(used, values))
+        return evaluator.eval(expression, previously_parsed=parsed)
+
+    if len(used) == 1:
+        name = used[0]
+        return lambda indicators: evaluate_values((getattr(indicators, name),))
+    # attrgetter of several names returns the values tuple directly (and of
+    # none, a constant expression, an empty one)
+    get_used = attrgetter(*used) if used else lambda indicators: ()
+    return lambda indicators: evaluate_values(get_used(indicators))
+
+
 class RuleEngine:
     """Engine for parsing and evaluating string-based rules on StockIndicators objects."""
 
@@ -33,7 +612,7 @@ class RuleEngine:
         """
         return set(StockIndicators.model_fields.keys())
 
-    def compile(self, rule_string: str) -> Callable[[StockIndicators], bool]:
+    def compile(self, rule_string: str) -> CompiledRule:
         """
         Compile a string rule into a callable function.
 
@@ -49,20 +628,14 @@ class RuleEngine:
             >>> result = rule(analysis)
         """
         # Normalize the rule string (handle case-insensitive AND/OR)
-        normalized_rule = self._normalize_rule(rule_string)
+        normalized_rule = _order_clauses(self._normalize_rule(rule_string))
+
+        run = _compile_expression(normalized_rule)
 
         def evaluate(analysis: StockIndicators) -> bool:
             """Evaluate the rule against a StockIndicators object."""
-            # Create a context with all StockIndicators attributes dynamically
-            # Use getattr to safely access fields, falling back to model_dump for compatibility
-            field_names = self._get_trend_analysis_field_names()
-            names = {
-                field_name: getattr(analysis, field_name) for field_name in field_names
-            }
             try:
-                # SimpleEval automatically validates the expression and only allows safe operations
-                evaluator = SimpleEval(names=names, functions=SAFE_FUNCTIONS)
-                result = evaluator.eval(normalized_rule)
+                result = run(analysis)
 
                 # Validate that the result is not a string (simpleeval should catch this, but double-check)
                 if isinstance(result, str):
@@ -85,7 +658,7 @@ class RuleEngine:
                     f"Make sure all field names are valid and the expression syntax is correct."
                 ) from e
 
-        return evaluate
+        return CompiledRule(evaluate, _compile_filter_batch(normalized_rule))
 
     def _normalize_rule(self, rule_string: str) -> str:
         """
@@ -99,8 +672,8 @@ class RuleEngine:
         """
         # Replace AND/OR (case-insensitive) with lowercase versions
         # Use word boundaries to avoid replacing parts of words
-        normalized = re.sub(r"\bAND\b", "and", rule_string, flags=re.IGNORECASE)
-        normalized = re.sub(r"\bOR\b", "or", normalized, flags=re.IGNORECASE)
+        normalized = _AND_RE.sub("and", rule_string)
+        normalized = _OR_RE.sub("or", normalized)
         return normalized
 
     def extract_involved_keys(self, rule_string: str) -> list[str]:
@@ -128,8 +701,7 @@ class RuleEngine:
         # Find all identifiers in the rule string
         # Match valid Python identifiers (word characters and underscores)
         # Use word boundaries to avoid partial matches
-        pattern = r"\b([a-zA-Z_][a-zA-Z0-9_]*)\b"
-        matches = re.findall(pattern, normalized)
+        matches = _IDENTIFIER_RE.findall(normalized)
 
         # Filter to only include valid StockIndicators keys
         involved_keys = [key for key in matches if key in valid_keys]
@@ -145,7 +717,8 @@ class RuleEngine:
         return result
 
 
-def compile_sort(sort_expr: str) -> Callable[[StockIndicators], float]:
+@lru_cache(maxsize=128)
+def compile_sort(sort_expr: str) -> CompiledSort:
     """
     Compile a sort expression string into a callable that returns a numeric score.
 
@@ -163,24 +736,25 @@ def compile_sort(sort_expr: str) -> Callable[[StockIndicators], float]:
         >>> rank = compile_sort("change_pct_13w / return_std_52w")
         >>> score = rank(indicators)
     """
-    field_names = set(StockIndicators.model_fields.keys())
+    run = _compile_expression(sort_expr)
 
     def evaluate(indicators: StockIndicators) -> float:
-        names = {name: getattr(indicators, name) for name in field_names}
         try:
-            evaluator = SimpleEval(names=names, functions=SAFE_FUNCTIONS)
-            result = evaluator.eval(sort_expr)
-            return float(result)
+            return float(run(indicators))
         except Exception:
             return float("-inf")
 
-    return evaluate
+    return CompiledSort(evaluate, _compile_batch(sort_expr, boolean_logic=False))
 
 
-def compile_rule(rule_string: str) -> Callable[[StockIndicators], bool]:
+@lru_cache(maxsize=128)
+def compile_rule(rule_string: str) -> CompiledRule:
     """
     Convenience function to compile a rule string.
 
+    Compiled rules are stateless, so the same callable is reused for repeated
+    strings (agent sweeps, per-rebalance default sort).
+
     Args:
         rule_string: String expression like "change_pct_13w > 1 AND max_drop_pct_2w > 15"
 
@@ -195,6 +769,22 @@ def compile_rule(rule_string: str) -> Callable[[StockIndicators], bool]:
     return engine.compile(rule_string)
 
 
+def normalize_sort(sort_expr: str) -> str:
+    """Canonical spelling of a sort expression: same parse tree, same string.
+
+    Expressions that don't parse only have their whitespace collapsed.
+    """
+    parsed = _try_parse(sort_expr)
+    if parsed is None:
+        return " ".join(sort_expr.split())
+    return ast.unparse(parsed)
+
+
+def normalize_rule(rule_string: str) -> str:
+    """Canonical spelling of a rule, with AND/OR handled as ``compile_rule`` does."""
+    return normalize_sort(RuleEngine()._normalize_rule(rule_string))
+
+
 def extract_involved_keys(rule_string: str) -> list[str]:
     """
     Convenience function to extract StockIndicators keys from a rule string.
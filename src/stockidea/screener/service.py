@@ -4,9 +4,9 @@ import asyncio
 import logging
 import re
 from datetime import datetime, timedelta
-from math import floor
 from typing import Callable
 
+import numpy as np
 from simpleeval import SimpleEval  # type: ignore
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -24,6 +24,7 @@ from stockidea.types import (
     STOP_LOSS_EXPR_SMA_PERIODS,
     StockIndex,
     StockIndicators,
+    StockPrice,
     StopLossConfig,
 )
 
@@ -94,13 +95,26 @@ async def resolve_stop_loss_price(
     return stop_price
 
 
-async def _lookup_buy_price(
-    db_session: AsyncSession, symbol: str, buy_date: datetime
-) -> float:
-    """Return the buy price (Monday-open convention) for a symbol on/near buy_date."""
-    price_data = await datasource_service.get_stock_price_at_date(
-        db_session, symbol, buy_date.date(), nearest=True
+async def _lookup_prices(
+    db_session: AsyncSession, symbols: list[str], on_date: datetime
+) -> dict[str, StockPrice]:
+    """Return each symbol's price on/near ``on_date``, fetched in one batch."""
+    prices = await datasource_service.get_stock_prices_at_date(
+        db_session, symbols, on_date.date()
     )
+    by_symbol: dict[str, StockPrice] = {}
+    for symbol in symbols:
+        price_data = prices.get(symbol.upper())
+        if price_data is None:
+            raise ValueError(
+                f"No price data available for symbol: {symbol} on date: {on_date.date()}"
+            )
+        by_symbol[symbol] = price_data
+    return by_symbol
+
+
+def _buy_price(symbol: str, price_data: StockPrice, buy_date: datetime) -> float:
+    """Return the buy price (Monday-open convention) from a symbol's price row."""
     if price_data.open is None:
         raise ValueError(
             f"No open price for {symbol} on/near {buy_date.date()} — "
@@ -129,10 +143,12 @@ async def _select_top_n(
         back_period_weeks=52,
         compute_if_not_exists=True,
     )
-    filtered = indicators_service.apply_rule(
-        indicators_batch, rule_func=rule_func, sort_func=sort_func
+    return indicators_service.apply_rule(
+        indicators_batch,
+        rule_func=rule_func,
+        sort_func=sort_func,
+        max_stocks=max_stocks,
     )
-    return filtered[:max_stocks]
 
 
 async def pick(
@@ -173,9 +189,12 @@ async def pick(
         f"{[s.symbol for s in selected]}"
     )
 
+    buy_prices = await _lookup_prices(
+        db_session, [stock.symbol for stock in selected], buy_date
+    )
     picks: list[Pick] = []
     for stock in selected:
-        buy_price = await _lookup_buy_price(db_session, stock.symbol, buy_date)
+        buy_price = _buy_price(stock.symbol, buy_prices[stock.symbol], buy_date)
         stop_loss_price = (
             await resolve_stop_loss_price(
                 db_session, stock.symbol, buy_date, buy_price, stop_loss
@@ -199,10 +218,11 @@ async def pick(
     # Portfolio mode: liquidate everything in concept, redistribute equally.
     holding_prices: dict[str, float] = {}
     total_value = portfolio.cash
+    holding_price_data = await _lookup_prices(
+        db_session, [holding.symbol for holding in portfolio.holdings], buy_date
+    )
     for holding in portfolio.holdings:
-        price_data = await datasource_service.get_stock_price_at_date(
-            db_session, holding.symbol, buy_date.date(), nearest=True
-        )
+        price_data = holding_price_data[holding.symbol]
         # Prefer open (matches buy convention); fall back to adj_close for valuation.
         held_price = (
             price_data.open if price_data.open is not None else price_data.adj_close
@@ -212,8 +232,11 @@ async def pick(
 
     if picks:
         allocation = total_value / len(picks)
-        for p in picks:
-            p.target_quantity = floor(allocation / p.buy_price)
+        pick_prices = np.fromiter((p.buy_price for p in picks), dtype=float)
+        with np.errstate(divide="raise", invalid="raise"):
+            quantities = np.floor(allocation / pick_prices).astype(np.int64)
+        for p, quantity in zip(picks, quantities.tolist()):
+            p.target_quantity = quantity
 
     holdings_dict = {h.symbol: h.quantity for h in portfolio.holdings}
     picks_by_symbol = {p.symbol: p for p in picks}
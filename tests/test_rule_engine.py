@@ -0,0 +1,86 @@
+"""Regression tests for rule/sort compilation.
+
+Run with ``uv run python -m unittest discover tests``.
+"""
+
+import unittest
+from datetime import date
+
+from stockidea.indicators.service import apply_rule
+from stockidea.rule_engine import compile_rule, compile_sort
+from stockidea.types import StockIndicators
+
+_FLOAT_FIELDS = {
+    name: 1.0
+    for name, field in StockIndicators.model_fields.items()
+    if field.annotation is float
+}
+
+
+def _indicators(symbol: str, **fields: float) -> StockIndicators:
+    return StockIndicators(
+        **{
+            **_FLOAT_FIELDS,
+            "symbol": symbol,
+            "date": date(2024, 1, 5),
+            "total_weeks": 52,
+            **fields,
+        }
+    )
+
+
+class CompiledSortBooleanLogicTest(unittest.TestCase):
+    """``and``/``or`` in a sort key return an operand, so the score is its value."""
+
+    def setUp(self) -> None:
+        self.items = [
+            _indicators("S0", change_pct_13w=5, r_squared_52w=0.9),
+            _indicators("S1", change_pct_13w=3, r_squared_52w=0.5),
+            _indicators("S2", change_pct_13w=-1, r_squared_52w=0.99),
+            _indicators("S3", change_pct_13w=2, r_squared_52w=0.7),
+        ]
+
+    def _ranked(self, sort_expr: str) -> list[str]:
+        ranked = apply_rule(self.items, sort_func=compile_sort(sort_expr))
+        return [item.symbol for item in ranked]
+
+    def test_and_scores_by_last_operand(self) -> None:
+        self.assertEqual(
+            self._ranked("change_pct_13w > 0 and r_squared_52w"),
+            ["S0", "S3", "S1", "S2"],
+        )
+
+    def test_or_scores_by_first_truthy_operand(self) -> None:
+        self.assertEqual(
+            self._ranked("r_squared_52w or change_pct_13w"),
+            ["S2", "S0", "S3", "S1"],
+        )
+
+
+class CompiledRuleErrorSemanticsTest(unittest.TestCase):
+    """Clause reordering must not turn a raising row into a silent reject."""
+
+    def assert_raises_everywhere(self, rule: str, item: StockIndicators) -> None:
+        compiled = compile_rule(rule)
+        with self.assertRaises(ValueError):
+            compiled(item)
+        with self.assertRaises(ValueError):
+            apply_rule([item, item], rule_func=compiled)
+
+    def test_zero_divisor_raises_before_cheaper_clause(self) -> None:
+        # The cheap comparison rejects the row, but it is written second
+        self.assert_raises_everywhere(
+            "change_pct_1w / total_weeks > 0 and change_pct_13w > 100",
+            _indicators("S0", total_weeks=0, change_pct_13w=5),
+        )
+
+    def test_bad_call_arity_raises_before_cheaper_clause(self) -> None:
+        # max() of a single float raises TypeError
+        self.assert_raises_everywhere(
+            "max(change_pct_13w) > 0 and change_pct_1w > 100",
+            _indicators("S0", change_pct_1w=5),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()